@@ -0,0 +1,78 @@
+"""
+Benchmark: clear_fields vs. the per-cell implementation it replaced
+
+- builds a synthetic Sugar-like export (free text, picklists, ids, numbers)
+- runs the legacy Series.apply(sanitize_field) + DataFrame.replace pipeline
+- runs clear_fields (columnar sanitize_series)
+- checks that both produce identical frames and prints the timings
+
+Usage:
+    python scripts/benchmark_cleaning.py [rows]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from vdmc_salesforce_migration import clear_fields, sanitize_field
+from vdmc_salesforce_migration.utils.cleaning import clean_numeric_fields
+
+# ------------------------------------------------------
+# Configuration
+# ------------------------------------------------------
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+rng = np.random.default_rng(42)
+
+
+# ------------------------------------------------------
+# Synthetic data
+# ------------------------------------------------------
+def _free_text(n):
+    words = np.array(["Müller", "Straße", "GmbH", "2€", "20°C", "m²", "\"quoted\"", "a;b",
+                      "line\r\nbreak", "tab\tbed", "  spaced  ", "naïve", "日本", "ok"])
+    picks = rng.integers(0, len(words), size=(n, 4))
+    return [" ".join(words[p]) for p in picks]
+
+
+def build_frame(n):
+    df = pd.DataFrame({
+        "description": _free_text(n),
+        "notes": _free_text(n),
+        "industry": rng.choice(["Retail", "Media", "nan", "None", "Öl & Gas", None], size=n),
+        "status": rng.choice(["Active", "Inactive", "NULL", ""], size=n),
+        "external_id": [f"{i:08x}-sugar" for i in range(n)],
+        "owner": rng.choice([f"user_{i}" for i in range(300)], size=n),
+        "annual_revenue": rng.random(n) * 1e6,
+        "employees": rng.integers(0, 5000, size=n),
+    })
+    df.loc[rng.random(n) < 0.1, "notes"] = None
+    return df.astype({c: object for c in ["description", "notes", "industry", "status", "external_id", "owner"]})
+
+
+def legacy_clear_fields(df):
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].apply(sanitize_field)
+    df = df.replace(["nan", "NaN", "None", "NONE", "null", "NULL"], "")
+    return clean_numeric_fields(df)
+
+
+# ------------------------------------------------------
+# Run
+# ------------------------------------------------------
+frame = build_frame(rows)
+print(f"Rows: {rows}, columns: {len(frame.columns)}")
+
+start = time.perf_counter()
+expected = legacy_clear_fields(frame.copy())
+legacy_time = time.perf_counter() - start
+print(f"legacy apply(sanitize_field): {legacy_time:.2f}s")
+
+start = time.perf_counter()
+result = clear_fields(frame.copy())
+columnar_time = time.perf_counter() - start
+print(f"clear_fields (columnar):      {columnar_time:.2f}s")
+
+pd.testing.assert_frame_equal(expected, result)
+print(f"✔ identical output, {legacy_time / columnar_time:.1f}x faster")
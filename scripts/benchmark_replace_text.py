@@ -0,0 +1,68 @@
+"""
+Benchmark: TextReplacer vs. the per-entry replace_text loop
+
+- builds a 2,000-entry legacy -> picklist translation table
+- runs Series.apply(replace_text) with the plain dict
+- runs TextReplacer(mapping).replace_series
+- checks that both produce identical series and prints the timings
+
+Usage:
+    python scripts/benchmark_replace_text.py [rows]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from vdmc_salesforce_migration import TextReplacer, replace_text
+
+# ------------------------------------------------------
+# Configuration
+# ------------------------------------------------------
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+entries = 2_000
+rng = np.random.default_rng(42)
+
+
+# ------------------------------------------------------
+# Synthetic data
+# ------------------------------------------------------
+def build_mapping(n):
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyzäöü"))
+    words = [f"{''.join(rng.choice(letters, size=rng.integers(4, 10))).capitalize()} {i}" for i in range(n)]
+    mapping = {word: f"PL_{word.upper().replace(' ', '_')}" for word in words}
+    # A few chained / overlapping entries, which need their own passes
+    mapping.update({"GmbH": "GmbH & Co. KG", "Co. KG": "Co KG", "Mr.": "Herr", "Herr ": "Hr. "})
+    return words, mapping
+
+
+def build_series(words, n):
+    picks = rng.choice(words, size=(n, 3))
+    suffixes = rng.choice(["GmbH", "Mr. Müller", "n/a", ""], size=n)
+    series = pd.Series([f"{' / '.join(p)} {s}" for p, s in zip(picks, suffixes)], dtype=object)
+    series[rng.random(n) < 0.05] = None
+    return series
+
+
+# ------------------------------------------------------
+# Run
+# ------------------------------------------------------
+words, mapping = build_mapping(entries)
+series = build_series(words, rows)
+print(f"Rows: {rows}, mapping entries: {len(mapping)}")
+
+start = time.perf_counter()
+expected = series.apply(lambda x: replace_text(x, mapping))
+legacy_time = time.perf_counter() - start
+print(f"legacy apply(replace_text):   {legacy_time:.2f}s")
+
+start = time.perf_counter()
+replacer = TextReplacer(mapping)
+result = replacer.replace_series(series)
+compiled_time = time.perf_counter() - start
+print(f"{replacer}: {compiled_time:.2f}s")
+
+pd.testing.assert_series_equal(expected, result)
+print(f"✔ identical output, {legacy_time / compiled_time:.1f}x faster")
@@ -1,13 +1,14 @@
 """
 Legacy Delete Script – modernized for new vdmc_salesforce_migration library
 
-- deletes records for a list of sObjects
+- deletes records for a list of sObjects, children before parents
+- independent sObjects are deleted in parallel (order derived from describe metadata)
 - handles multi-pass deletes with smaller batch sizes to avoid DELETE_OPERATION_TOO_LARGE
 - deactivates Order records before deletion
 - saves Bulk API failure logs
 """
 
-from vdmc_salesforce_migration import get_salesforce_client, cleanup_sobject
+from vdmc_salesforce_migration import get_salesforce_client, cleanup_org
 
 # ------------------------------------------------------
 # Configuration
@@ -37,12 +38,14 @@ objects = [
     'Product2',
 ]
 
+# Number of sObjects deleted at the same time
+max_workers = 4
+
 
 # ------------------------------------------------------
-# Main Delete Loop
+# Main Delete
 # ------------------------------------------------------
 client = get_salesforce_client()
 
-for obj in objects:
-    cleanup_sobject(client, obj)
+cleanup_org(client, objects, max_workers=max_workers)
 
@@ -4,10 +4,8 @@ Example Migration Script: Accounts
 This script demonstrates how to:
 - load mapping files
 - load and map CSV data
-- clean fields
-- merge custom tables
+- clean fields, dates, emails and lookups with the transforms of the mapping file
 - map Salesforce IDs using SOQL helper functions
-- sanitize emails and dates
 - upload Accounts using the REST API
 
 Environment is automatically chosen from config.json.
@@ -19,9 +17,7 @@ from vdmc_salesforce_migration import (
     get_salesforce_client,
     load_mapping,
     load_file_with_mapping,
-    clear_fields,
-    convert_datetime,
-    clean_emails,
+    compile_cleaning_plan,
     get_field_map,
     get_record_types,
     upload_to_sf_bulk
@@ -55,21 +51,7 @@ df = load_file_with_mapping(pattern, map_path, "field_map")
 
 
 # ------------------------------------------------------
-# 4) Cleaning and preprocessing
-# ------------------------------------------------------
-df = clear_fields(df)
-
-
-# ------------------------------------------------------
-# 5) Convert datetime fields to Salesforce ISO format
-# ------------------------------------------------------
-for field in ["CreatedDate", "LastModifiedDate"]:
-    if field in df.columns:
-        df = convert_datetime(df, field)
-
-
-# ------------------------------------------------------
-# 6) Map User IDs (CreatedById, OwnerId, etc.)
+# 4) Lookups used by the transforms in the mapping file
 # ------------------------------------------------------
 user_map = get_field_map(
     client,
@@ -77,30 +59,19 @@ user_map = get_field_map(
     key_field="vDMC_SugarExternalId__c",
     value_field="Id"
 )
-
-for field in ["CreatedById", "LastModifiedById", "OwnerId"]:
-    if field in df.columns:
-        df[field] = df[field].map(user_map)
-
-
-# ------------------------------------------------------
-# 7) Record Type Mapping
-# ------------------------------------------------------
 record_types = get_record_types(client, "Account")
 
-# map via mapping['recordtype_map'] first → then to actual SF IDs
-df["RecordTypeId"] = (
-    df["Type"]
-    .map(mapping["recordtype_map"])
-    .map(record_types)
-)
-
 
 # ------------------------------------------------------
-# 8) Email Cleanup
+# 5-8) Cleaning, datetimes, user IDs, record types, emails
+#     → declared per column in mapping['transforms'],
+#       run in a single pass over each column
 # ------------------------------------------------------
-if "vDMC_Email__c" in df.columns:
-    df = clean_emails(df, "vDMC_Email__c")
+plan = compile_cleaning_plan(
+    mapping,
+    lookups={"user_map": user_map, "record_types": record_types}
+)
+df = plan.apply(df)
 
 
 # ------------------------------------------------------
@@ -63,9 +63,8 @@ df = clear_fields(df)
 # ------------------------------------------------------
 # 5) Convert datetime fields to Salesforce ISO format
 # ------------------------------------------------------
-for field in ["CreatedDate", "LastModifiedDate"]:
-    if field in df.columns:
-        df = convert_datetime(df, field)
+date_fields = [f for f in ["CreatedDate", "LastModifiedDate"] if f in df.columns]
+df = convert_datetime(df, date_fields, format="auto")
 
 
 # ------------------------------------------------------
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from vdmc_salesforce_migration.api import async_uploader
+from vdmc_salesforce_migration.api.throttle import AdaptiveRateController
+from vdmc_salesforce_migration.utils.logging import CsvLogWriter
+
+
+class StandInSalesforce(ThreadingHTTPServer):
+    """Local stand-in for the sObject REST endpoint: counts concurrency, throttles the first requests."""
+
+    daemon_threads = True
+
+    def __init__(self, throttled: int = 0, delay: float = 0.02):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.throttled = throttled
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = self.max_in_flight = self.requests = 0
+        self.records = []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            throttle = server.requests <= server.throttled
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        threading.Event().wait(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+            if not throttle:
+                server.records.append(body)
+
+        if throttle:
+            status, reply = 503, [{"errorCode": "SERVER_UNAVAILABLE", "message": "Try again"}]
+        else:
+            status, reply = 201, {"id": f"001{len(server.records):015d}", "success": True, "errors": []}
+        data = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Sforce-Limit-Info", "api-usage=10/15000")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(**kwargs):
+        server = StandInSalesforce(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        client = SimpleNamespace(
+            base_url=f"http://127.0.0.1:{server.server_address[1]}/services/data/v59.0/",
+            session_id="session",
+        )
+        return server, client
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _upload(monkeypatch, tmp_path, client, controller, records):
+    monkeypatch.setattr(async_uploader, "get_async_rate_controller", lambda: controller)
+    log_writer = CsvLogWriter(tmp_path / "log.csv", ["external_id", "sf_id", "success", "errors"])
+    with log_writer:
+        asyncio.run(async_uploader.upload_to_sf_rest_async(
+            client, "Account", records, id_field="external_id", max_in_flight=50, log_writer=log_writer
+        ))
+    with open(tmp_path / "log.csv", encoding="utf-8") as f:
+        return f.read().splitlines()[1:]
+
+
+def test_requests_respect_the_controller_window(monkeypatch, tmp_path, stand_in):
+    server, client = stand_in()
+    controller = AdaptiveRateController(initial_concurrency=3, max_concurrency=3)
+    records = [{"external_id": f"ext-{i}", "Name": f"Account {i}"} for i in range(40)]
+
+    lines = _upload(monkeypatch, tmp_path, client, controller, records)
+
+    assert len(lines) == 40 and all(",True," in line for line in lines)
+    assert len(server.records) == 40
+    assert server.max_in_flight <= 3
+    assert controller.in_flight == 0
+    assert controller.api_usage == (10, 15000)
+
+
+def test_throttling_shrinks_the_shared_window(monkeypatch, tmp_path, stand_in):
+    server, client = stand_in(throttled=4)
+    controller = AdaptiveRateController(
+        initial_concurrency=8, max_concurrency=8, base_delay=0.01, max_delay=0.05
+    )
+    records = [{"external_id": f"ext-{i}", "Name": f"Account {i}"} for i in range(20)]
+
+    lines = _upload(monkeypatch, tmp_path, client, controller, records)
+
+    assert len(lines) == 20 and all(",True," in line for line in lines)
+    assert server.requests == 24
+    assert controller.limit < 8
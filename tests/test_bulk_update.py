@@ -0,0 +1,16 @@
+import pytest
+
+from vdmc_salesforce_migration.api import uploader
+from vdmc_salesforce_migration.api.uploader import UploadError, update_to_sf_bulk
+
+
+def test_update_never_becomes_an_upsert(monkeypatch):
+    calls = []
+    monkeypatch.setattr(uploader, "_run_bulk_job", lambda *args: calls.append(args))
+
+    with pytest.raises(UploadError):
+        update_to_sf_bulk(None, "Account", [{"External_Id__c": "a", "Name": "A"}], external_identifier="External_Id__c")
+    assert calls == []
+
+    update_to_sf_bulk(None, "Account", [{"Id": "001000000000001", "Name": "A"}])
+    assert calls[0][2] == "update" and calls[0][4] is None
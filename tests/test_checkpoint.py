@@ -0,0 +1,73 @@
+import pytest
+
+from vdmc_salesforce_migration.api import bulk2
+from vdmc_salesforce_migration.utils.checkpoint import Checkpoint, CheckpointError
+
+
+class FakeBulk:
+    """Stand-in for the ingest endpoints: jobs finish on the first poll."""
+
+    def __init__(self, monkeypatch, failed_rows=b""):
+        self.submitted = []
+        self.failed_rows = failed_rows
+        monkeypatch.setattr(bulk2, "_submit_ingest_job", self.submit)
+        monkeypatch.setattr(bulk2, "get_job", self.get_job)
+        monkeypatch.setattr(bulk2, "get_failed_results", lambda client, job_id: self.failed_rows)
+
+    def submit(self, client, object_name, operation, payload, external_id_field=None):
+        self.submitted.append(payload)
+        return f"750{len(self.submitted)}"
+
+    def get_job(self, client, job_id):
+        payload = self.submitted[int(job_id[3:]) - 1]
+        failed = 1 if b"bad" in payload else 0
+        return {"id": job_id, "state": "JobComplete", "numberRecordsProcessed": 1, "numberRecordsFailed": failed}
+
+
+def _ingest(tmp_path, payloads):
+    with Checkpoint(tmp_path, "develop", "run1", "Account_upsert") as checkpoint:
+        return bulk2.run_ingest(None, "Account", "upsert", payloads, poll_interval=0, checkpoint=checkpoint)
+
+
+def test_resume_skips_complete_payloads(monkeypatch, tmp_path):
+    fake = FakeBulk(monkeypatch)
+    payloads = [(b"Name\na\n", 1), (b"Name\nb\n", 1)]
+
+    _ingest(tmp_path, payloads)
+    _ingest(tmp_path, payloads)
+
+    assert fake.submitted == [b"Name\na\n", b"Name\nb\n"]
+
+
+def test_different_input_under_same_run_id_raises(monkeypatch, tmp_path):
+    fake = FakeBulk(monkeypatch)
+    _ingest(tmp_path, [(b"Name\na\n", 1)])
+
+    with pytest.raises(CheckpointError):
+        _ingest(tmp_path, [(b"ParentId\n001\n", 1)])
+    assert len(fake.submitted) == 1
+
+
+def test_failed_rows_of_complete_jobs_are_resubmitted(monkeypatch, tmp_path):
+    fake = FakeBulk(monkeypatch, failed_rows=b'"sf__Id","sf__Error",Name\n"","DUPLICATE",bad\n')
+    payloads = [(b"Name\nbad\ngood\n", 2)]
+
+    _ingest(tmp_path, payloads)
+    # The retried row succeeds this time; a third run has nothing left to do
+    monkeypatch.setattr(bulk2, "get_job", lambda client, job_id: {"id": job_id, "state": "JobComplete"})
+    _ingest(tmp_path, payloads)
+    _ingest(tmp_path, payloads)
+
+    assert fake.submitted == [b"Name\nbad\ngood\n", b"Name\nbad\n"]
+
+
+def test_rest_checkpoint_rejects_other_columns(tmp_path):
+    with Checkpoint(tmp_path, "develop", "run1", "Account_rest") as checkpoint:
+        records = checkpoint.skip_completed([{"external_id": "a", "Name": "A"}], "external_id")
+        assert [r["external_id"] for r in records] == ["a"]
+        checkpoint.mark_completed(["a"])
+
+    with Checkpoint(tmp_path, "develop", "run1", "Account_rest") as checkpoint:
+        assert list(checkpoint.skip_completed([{"Name": "A", "external_id": "a"}], "external_id")) == []
+        with pytest.raises(CheckpointError):
+            checkpoint.skip_completed([{"external_id": "a", "ParentId": "001"}], "external_id")
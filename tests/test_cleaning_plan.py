@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from vdmc_salesforce_migration.utils.cleaning import clear_fields, compile_cleaning_plan
+
+
+def _frame():
+    return pd.DataFrame({
+        "annual_revenue": [1.0, np.nan, 3.0],
+        "employees": [10, 20, 30],
+        "name": pd.Series([" Müller  GmbH", "None", None], dtype=object),
+        "notes": pd.Series(["a;b", "nan", "line\r\nbreak"], dtype=object),
+    })
+
+
+def test_default_sanitize_matches_clear_fields():
+    plan = compile_cleaning_plan({"transforms": {"*": ["sanitize"]}})
+
+    result = plan.apply(_frame())
+
+    pd.testing.assert_frame_equal(result, clear_fields(_frame()))
+    assert result["annual_revenue"].tolist() == [1.0, 0.0, 3.0]
+
+
+def test_explicit_columns_are_not_touched_by_the_default():
+    plan = compile_cleaning_plan({"transforms": {"*": ["sanitize"], "annual_revenue": []}})
+
+    result = plan.apply(_frame())
+
+    assert np.isnan(result["annual_revenue"][1])
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from vdmc_salesforce_migration.api import cleanup
+from vdmc_salesforce_migration.api.cleanup import CleanupError, build_dependencies, _resolve_cycles
+
+
+def _lookup(*targets, nillable=True, cascade=False, restricted=False):
+    return {
+        "type": "reference",
+        "referenceTo": list(targets),
+        "nillable": nillable,
+        "cascadeDelete": cascade,
+        "restrictedDelete": restricted,
+    }
+
+
+DESCRIBES = {
+    "Account": {"fields": [{"type": "string"}, _lookup("Account"), _lookup("Contact")]},
+    "Contact": {"fields": [_lookup("Account", nillable=False)]},
+    "Opportunity": {"fields": [_lookup("Account", nillable=False), _lookup("User")]},
+    "OpportunityLineItem": {"fields": [_lookup("Opportunity", cascade=True)]},
+}
+OBJECTS = list(DESCRIBES)
+
+
+@pytest.fixture
+def fake_cleanup(monkeypatch):
+    """Replace the delete with a recorder; objects in <fail> raise, <leftover> records stay behind."""
+    calls, fail, leftover, lock = [], set(), {}, threading.Lock()
+
+    def cleanup_sobject(client, name):
+        with lock:
+            calls.append(name)
+        if name in fail:
+            raise RuntimeError("delete failed")
+        return leftover.get(name, 0)
+
+    monkeypatch.setattr(cleanup, "cleanup_sobject", cleanup_sobject)
+    monkeypatch.setattr(cleanup, "configure_shared_client", lambda client, pool_size: None)
+    return calls, fail, leftover
+
+
+def test_build_dependencies_edges():
+    dependencies = build_dependencies(DESCRIBES, OBJECTS)
+
+    assert dependencies == {
+        # Self reference and the unlisted User are ignored
+        "Account": {"Contact": True, "Opportunity": True},
+        "Contact": {"Account": False},
+        "Opportunity": {"OpportunityLineItem": True},
+        "OpportunityLineItem": {},
+    }
+
+
+def test_missing_describe_raises():
+    with pytest.raises(CleanupError):
+        build_dependencies({"Account": {"fields": []}}, ["Account", "Contact"])
+
+
+def test_soft_edge_in_cycle_is_dropped():
+    waiting_on = _resolve_cycles(OBJECTS, build_dependencies(DESCRIBES, OBJECTS))
+
+    # Account.Contact__c is nillable: Contact no longer waits on Account
+    assert waiting_on["Contact"] == set()
+    assert waiting_on["Account"] == {"Contact", "Opportunity"}
+
+
+def test_hard_cycle_raises():
+    describes = {
+        "A__c": {"fields": [_lookup("B__c", nillable=False)]},
+        "B__c": {"fields": [_lookup("A__c", restricted=True)]},
+    }
+    with pytest.raises(CleanupError):
+        _resolve_cycles(list(describes), build_dependencies(describes, list(describes)))
+
+
+def test_children_deleted_before_parents(fake_cleanup):
+    calls, _, _ = fake_cleanup
+    results = cleanup.cleanup_org(None, OBJECTS, max_workers=4, describes=DESCRIBES)
+
+    assert set(results.values()) == {"done"}
+    assert calls.index("OpportunityLineItem") < calls.index("Opportunity") < calls.index("Account")
+    assert calls.index("Contact") < calls.index("Account")
+
+
+def test_parents_of_failed_child_are_skipped(fake_cleanup):
+    calls, fail, _ = fake_cleanup
+    fail.add("OpportunityLineItem")
+    results = cleanup.cleanup_org(None, OBJECTS, max_workers=2, describes=DESCRIBES)
+
+    assert results["OpportunityLineItem"].startswith("error")
+    assert results["Opportunity"] == "skipped: child OpportunityLineItem failed"
+    assert results["Account"] == "skipped: child Opportunity failed"
+    assert results["Contact"] == "done"
+    assert "Opportunity" not in calls and "Account" not in calls
+
+
+def test_records_left_behind_skip_the_parents(fake_cleanup):
+    calls, _, leftover = fake_cleanup
+    leftover["Contact"] = 3
+    results = cleanup.cleanup_org(None, OBJECTS, max_workers=2, describes=DESCRIBES)
+
+    assert results["Contact"] == "error: 3 records could not be deleted"
+    assert results["Account"] == "skipped: child Contact failed"
+    assert "Account" not in calls
@@ -0,0 +1,49 @@
+from vdmc_salesforce_migration.api import uploader
+
+
+class FakeDeletes:
+    """delete_from_sf_bulk stand-in: Ids in <locked> keep failing with a lock error."""
+
+    def __init__(self, monkeypatch, ids, first_errors, locked=()):
+        self.calls = []
+        self.first_errors = first_errors
+        self.locked = set(locked)
+        monkeypatch.setattr(uploader, "iter_record_ids", lambda client, object_name: iter({"Id": i} for i in ids))
+        monkeypatch.setattr(uploader, "delete_from_sf_bulk", self.delete)
+
+    def delete(self, client, object_name, data, batch_size, max_concurrent_jobs=None):
+        ids = [row["Id"] for row in data]
+        self.calls.append((len(ids), batch_size))
+        if len(self.calls) == 1:
+            return [{"sf__Id": "", "sf__Error": f"{code}:message:--", "Id": i} for i, code in self.first_errors.items()]
+        return [{"sf__Id": "", "sf__Error": "UNABLE_TO_LOCK_ROW:busy:--", "Id": i} for i in ids if i in self.locked]
+
+
+def test_only_retryable_errors_are_retried(monkeypatch):
+    fake = FakeDeletes(monkeypatch, ["a", "b", "c", "d"], {
+        "a": "UNABLE_TO_LOCK_ROW",
+        "b": "DELETE_OPERATION_TOO_LARGE",
+        "c": "ENTITY_IS_DELETED",
+    })
+
+    remaining = uploader.cleanup_sobject(None, "Account", initial_batch_size=8)
+
+    # c is final; a and b are retried once in a job of half the failures and succeed
+    assert fake.calls == [(4, 8), (2, 1)]
+    assert remaining == 1
+
+
+def test_retry_halves_job_size_down_to_one(monkeypatch):
+    ids = [f"id{i}" for i in range(8)]
+    fake = FakeDeletes(monkeypatch, ids, {i: "UNABLE_TO_LOCK_ROW" for i in ids}, locked=["id3"])
+
+    remaining = uploader.cleanup_sobject(None, "Account", initial_batch_size=16)
+
+    assert [batch_size for _, batch_size in fake.calls] == [16, 4, 1]
+    assert [count for count, _ in fake.calls] == [8, 8, 1]
+    assert remaining == 1
+
+
+def test_empty_object_returns_zero(monkeypatch):
+    FakeDeletes(monkeypatch, [], {})
+    assert uploader.cleanup_sobject(None, "Account") == 0
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from vdmc_salesforce_migration.utils.distinct import apply_to_distinct
+
+
+def test_func_runs_once_per_distinct_value():
+    seen = []
+
+    def upper(values):
+        seen.extend(values)
+        return [v.upper() for v in values]
+
+    series = pd.Series(["a", "b", None, "a", np.nan, "b"], index=range(5, 11), dtype=object)
+    result = apply_to_distinct(series, upper, "")
+
+    assert seen == ["a", "b"]
+    assert result.tolist() == ["A", "B", "", "A", "", "B"]
+    assert list(result.index) == list(series.index)
+
+
+def test_values_that_print_differently_are_not_merged():
+    series = pd.Series([1, 1.0, True, 0.0, -0.0, None], dtype=object)
+    result = apply_to_distinct(series, lambda values: [str(v) for v in values], "")
+
+    assert result.tolist() == ["1", "1.0", "True", "0.0", "-0.0", ""]
+
+
+def test_all_missing_and_explicit_dtype():
+    series = pd.Series([None, np.nan], dtype=object)
+    result = apply_to_distinct(series, lambda values: list(values), np.nan, dtype=object)
+
+    assert result.dtype == object
+    assert result.isna().all()
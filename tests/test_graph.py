@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from vdmc_salesforce_migration.api import graph
+from vdmc_salesforce_migration.api.graph import _build_graphs
+from vdmc_salesforce_migration.utils.logging import CsvLogWriter
+
+VERSION = "/services/data/v59.0"
+
+
+def _contacts(parent_key, count, start=0):
+    return [
+        {"account_ext": parent_key, "ext": f"{parent_key}-c{i}", "LastName": f"Contact {i}"}
+        for i in range(start, start + count)
+    ]
+
+
+def _spec(records):
+    return {
+        "object": "Contact",
+        "records": records,
+        "reference_field": "account_ext",
+        "lookup_field": "AccountId",
+        "external_id": "ext",
+    }
+
+
+def _build(parents, contacts, max_graph_nodes=500):
+    parents = [{"ext": key, "Name": key} for key in parents]
+    return _build_graphs(VERSION, "Account", parents, "ext", [_spec(contacts)], max_graph_nodes)
+
+
+def test_parent_and_children_share_a_graph():
+    graphs, orphans = _build(["A", "B"], _contacts("A", 2) + _contacts("B", 1))
+
+    assert len(graphs) == 1 and orphans == []
+    nodes = graphs[0]["nodes"]
+    assert [node["referenceId"] for node in nodes] == ["p1", "p1c0", "p1c1", "p2", "p2c0"]
+    assert nodes[0]["method"] == "PATCH" and nodes[0]["url"].endswith("/sobjects/Account/ext/A")
+    assert nodes[1]["body"] == {"LastName": "Contact 0", "AccountId": "@{p1.id}"}
+    assert graphs[0]["node_keys"]["p2c0"] == ("Contact", "B-c0")
+    assert graphs[0]["depends_on"] == set()
+
+
+def test_graphs_hold_at_most_500_nodes():
+    # 3 parents with 200 children each: 603 nodes do not fit into one graph
+    contacts = [c for key in "ABC" for c in _contacts(key, 200)]
+    graphs, _ = _build(list("ABC"), contacts)
+
+    assert [len(g["nodes"]) for g in graphs] == [402, 201]
+    assert all(g["depends_on"] == set() for g in graphs)
+
+
+def test_split_parent_is_upserted_once_and_referenced_later():
+    graphs, _ = _build(["A"], _contacts("A", 600))
+
+    assert [len(g["nodes"]) for g in graphs] == [500, 102]
+    first, follow_up = graphs
+
+    upserts = [n for g in graphs for n in g["nodes"] if n["url"].startswith(f"{VERSION}/sobjects/Account/")
+               and n["method"] == "PATCH"]
+    assert len(upserts) == 1
+
+    lookup = follow_up["nodes"][0]
+    assert lookup["method"] == "GET" and lookup["url"].endswith("/sobjects/Account/ext/A?fields=Id")
+    assert follow_up["node_keys"][lookup["referenceId"]] is None
+    assert follow_up["nodes"][1]["body"]["AccountId"] == f"@{{{lookup['referenceId']}.Id}}"
+    assert follow_up["depends_on"] == {0}
+    assert first["depends_on"] == set()
+
+
+def test_orphans_are_logged_as_failed(monkeypatch, tmp_path):
+    log_path = tmp_path / "graph_write.csv"
+    monkeypatch.setattr(graph, "open_csv_log", lambda **kwargs: CsvLogWriter(log_path, kwargs["header"]))
+    monkeypatch.setattr(graph, "_post_graph", lambda client, graph_id, nodes: {
+        "isSuccessful": True,
+        "graphResponse": {"compositeResponse": [
+            {"referenceId": n["referenceId"], "body": {"id": f"id-{n['referenceId']}"}} for n in nodes
+        ]},
+    })
+    client = SimpleNamespace(sf_version="59.0")
+
+    id_maps = graph.upload_graph_to_sf(
+        client, "Account", [{"ext": "A", "Name": "A"}], "ext",
+        [_spec(_contacts("A", 1) + _contacts("missing", 1))],
+    )
+
+    assert id_maps == {"Account": {"A": "id-p1"}, "Contact": {"A-c0": "id-p1c0"}}
+    rows = log_path.read_text(encoding="utf-8").splitlines()
+    assert "Contact,missing-c0,,False,Skipped: parent missing is not in the input" in rows
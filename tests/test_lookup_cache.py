@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from vdmc_salesforce_migration.utils import soql
+from vdmc_salesforce_migration.utils.lookup_cache import LookupCache
+
+KEY = LookupCache.make_key("https://example.my.salesforce.com", "develop", "User", ["Ext__c", "Id"])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LookupCache(tmp_path / "lookups.sqlite", ttl_seconds=3600, max_bytes=10 ** 6)
+
+
+def test_watermark_of_missing_fresh_and_expired_entries(cache, monkeypatch):
+    assert cache.get_watermark(KEY) is None
+
+    cache.replace(KEY, [
+        ("005A", "a", "005A", "2024-05-01T10:00:00Z"),
+        ("005B", 7, "005B", "2024-05-02T09:00:00Z"),
+    ])
+    assert cache.get_watermark(KEY) == "2024-05-02T09:00:00Z"
+    # REST types survive the JSON round trip
+    assert cache.load_map(KEY) == {"a": "005A", 7: "005B"}
+
+    monkeypatch.setattr(cache, "ttl_seconds", -1)
+    assert cache.get_watermark(KEY) is None
+
+
+def test_apply_changes_upserts_removes_and_advances_watermark(cache):
+    cache.replace(KEY, [("005A", "a", "005A", "2024-05-01T10:00:00Z"), ("005B", "b", "005B", "2024-05-01T10:00:00Z")])
+
+    cache.apply_changes(KEY, [("005A", "a2", "005A", "2024-06-01T08:00:00Z"), ("005C", "c", "005C", "2024-05-20T00:00:00Z")], ["005B"])
+
+    assert cache.load_map(KEY) == {"a2": "005A", "c": "005C"}
+    assert cache.get_watermark(KEY) == "2024-06-01T08:00:00Z"
+
+    # An empty refresh keeps the watermark
+    cache.apply_changes(KEY, [], [])
+    assert cache.get_watermark(KEY) == "2024-06-01T08:00:00Z"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LookupCache(tmp_path / "lookups.sqlite", ttl_seconds=3600, max_bytes=300)
+    keys = [LookupCache.make_key("org", "develop", name, ["Ext__c", "Id"]) for name in ("A", "B", "C")]
+    rows = [(f"001{i:015d}", f"ext-{i}", f"001{i:015d}", None) for i in range(3)]  # 135 bytes per entry
+
+    cache.replace(keys[0], rows)
+    cache.replace(keys[1], rows)
+    cache.load_map(keys[0])          # A is now more recent than B
+    cache.replace(keys[2], rows)
+
+    assert cache.get_watermark(keys[1]) is None
+    assert cache.load_map(keys[0]) and cache.load_map(keys[2])
+
+
+def test_cached_field_map_refreshes_incrementally(cache, monkeypatch):
+    queries = []
+    remote = {"005A": ("a", "2024-05-01T10:00:00Z"), "005B": ("b", "2024-05-01T10:00:00Z")}
+    removed = []
+
+    def fake_rows(client, query, key_field, value_field, engine):
+        queries.append((query, engine))
+        since = query.split("SystemModstamp >= ")[1] if ">=" in query else ""
+        for record_id, (key, modstamp) in remote.items():
+            if modstamp >= since:
+                yield record_id, key, record_id, modstamp
+
+    monkeypatch.setattr(soql, "get_lookup_cache", lambda: cache)
+    monkeypatch.setattr(soql, "_iter_cache_rows", fake_rows)
+    monkeypatch.setattr(soql, "_removed_ids", lambda client, object_name, where, since: list(removed))
+    client = SimpleNamespace(sf_instance="example.my.salesforce.com")
+
+    assert soql.get_field_map(client, "User", "Ext__c", "Id", use_cache=True) == {"a": "005A", "b": "005B"}
+    assert "SystemModstamp >=" not in queries[0][0]
+
+    remote["005C"] = ("c", "2024-05-03T00:00:00Z")
+    del remote["005B"]
+    removed.append("005B")
+
+    assert soql.get_field_map(client, "User", "Ext__c", "Id", use_cache=True) == {"a": "005A", "c": "005C"}
+    assert queries[1] == (
+        "SELECT Id, Ext__c, SystemModstamp FROM User WHERE SystemModstamp >= 2024-05-01T10:00:00Z", "rest"
+    )
@@ -0,0 +1,42 @@
+import json
+
+import requests
+
+from vdmc_salesforce_migration.api import uploader
+
+ENDPOINT = "https://example.my.salesforce.com/services/data/v59.0/actions/standard/createOrUpdateAssetFromOrder"
+
+
+def _response(status, body):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode()
+    return response
+
+
+def _activate(monkeypatch, batch, status, body):
+    monkeypatch.setattr(uploader, "sf_request", lambda *args, **kwargs: _response(status, body))
+    return uploader._activate_order_batch(None, ENDPOINT, batch)
+
+
+def test_partial_failure_with_error_status_is_parsed_per_order(monkeypatch):
+    body = json.dumps([
+        {"isSuccess": True, "errors": None},
+        {"isSuccess": False, "errors": [{"statusCode": "INVALID_STATUS", "message": "Order not activated"}]},
+    ])
+    rows = _activate(monkeypatch, ["801A", "801B"], 400, body)
+    assert rows == [["801B", "INVALID_STATUS: Order not activated"]]
+
+
+def test_short_result_list_logs_unmatched_orders(monkeypatch):
+    body = json.dumps([{"isSuccess": True, "errors": None}])
+    rows = _activate(monkeypatch, ["801A", "801B", "801C"], 200, body)
+    assert [row[0] for row in rows] == ["801B", "801C"]
+    assert all("No result returned" in row[1] for row in rows)
+
+
+def test_non_list_body_fails_whole_batch(monkeypatch):
+    body = json.dumps({"errorCode": "INVALID_SESSION_ID", "message": "Session expired"})
+    rows = _activate(monkeypatch, ["801A", "801B"], 401, body)
+    assert [row[0] for row in rows] == ["801A", "801B"]
+    assert rows[0][1].startswith("HTTP 401")
@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from vdmc_salesforce_migration.utils.records import clean_payload, iter_csv_payloads, iter_records
+
+
+def test_clean_payload_drops_missing_values():
+    owners = pd.Series(["u1", "u2"]).map({"u1": "005000000000001"})
+    record = {
+        "external_id": "a",
+        "Name": "Acme",
+        "OwnerId": owners[1],
+        "Phone": "",
+        "Fax": None,
+        "NumberOfEmployees": pd.NA,
+        "LastActivityDate": pd.NaT,
+        "AnnualRevenue": np.nan,
+        "IsActive": False,
+        "Rating": 0,
+    }
+
+    payload = clean_payload(record, ["external_id"])
+
+    assert payload == {"Name": "Acme", "IsActive": False, "Rating": 0}
+    json.dumps(payload, allow_nan=False)
+
+
+def test_csv_payload_renders_missing_values_as_empty_cells():
+    df = pd.DataFrame({
+        "Name": pd.array(["a", None], dtype="string"),
+        "Employees": pd.array([1, None], dtype="Int64"),
+        "Active": pd.array([True, None], dtype="boolean"),
+        "Since": pd.to_datetime(["2024-01-02", None]),
+    })
+
+    (payload, count), = iter_csv_payloads(iter_records(df), max_bytes=10000)
+
+    assert count == 2
+    assert payload.decode().splitlines() == ["Name,Employees,Active,Since", "a,1,True,2024-01-02 00:00:00", ",,,"]
@@ -0,0 +1,50 @@
+import re
+from urllib.parse import quote
+
+import requests
+
+from vdmc_salesforce_migration.utils.soql import MAX_SOQL_LENGTH, _chunk_in_queries
+
+QUERY_URL = "https://example.my.salesforce.com/services/data/v59.0/query/"
+PREFIX = "SELECT Id, vDMC_SugarExternalId__c FROM Account WHERE Id"
+
+
+def _salesforce_ids(count):
+    return [f"001{i:012d}AAA" for i in range(count)]
+
+
+def test_chunks_of_18_character_ids_fit_the_encoded_budget():
+    ids = _salesforce_ids(5000)
+    assert all(len(i) == 18 for i in ids)
+
+    queries = _chunk_in_queries(PREFIX, ids)
+
+    assert len(queries) > 1
+    for soql in queries:
+        assert len(quote(soql, safe="")) <= MAX_SOQL_LENGTH
+        # The URL as requests sends it (simple_salesforce passes q= as params)
+        url = requests.Request("GET", QUERY_URL, params={"q": soql}).prepare().url
+        assert len(url) < 16000
+
+
+def test_chunks_keep_every_value_in_order():
+    ids = _salesforce_ids(5000)
+
+    queries = _chunk_in_queries(PREFIX, ids)
+
+    found = [value for soql in queries for value in re.findall(r"'([^']*)'", soql)]
+    assert found == ids
+
+
+def test_values_are_escaped_and_counted_encoded():
+    values = ["O'Brien", "a\\b", "München & Co"]
+
+    (soql,) = _chunk_in_queries("SELECT Id FROM Contact WHERE LastName", values)
+
+    assert soql == "SELECT Id FROM Contact WHERE LastName IN ('O\\'Brien','a\\\\b','München & Co')"
+
+
+def test_single_oversized_value_still_gets_a_query():
+    queries = _chunk_in_queries(PREFIX, ["x" * 200], max_length=50)
+
+    assert queries == [f"{PREFIX} IN ('{'x' * 200}')"]
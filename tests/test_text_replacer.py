@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vdmc_salesforce_migration.utils.cleaning import TextReplacer, replace_text
+
+
+def sequential(text, mapping):
+    """Reference semantics: the plain str.replace loop."""
+    for old, new in mapping.items():
+        text = text.replace(old, new)
+    return text
+
+
+@pytest.mark.parametrize("mapping, text", [
+    # Overlapping keys: mapping order decides, not key length
+    ({"ab": "X", "abc": "Y"}, "abcab"),
+    ({"abc": "Y", "ab": "X"}, "abcab"),
+    ({"bc": "1", "ab": "2"}, "abcabc"),
+    ({"aa": "b"}, "aaaaa"),
+    # Keys created by earlier replacements
+    ({"a": "b", "b": "c"}, "aab"),
+    ({"b": "c", "a": "b"}, "aab"),
+    ({"x": "ab", "ba": "!"}, "xbxa"),
+    ({"ä": "ae", "ae": "æ"}, "Mädchen aerial"),
+    # Deletions joining their neighbours into a new match
+    ({"-": "", "ab": "X"}, "a-b a--b"),
+    ({" ": "", "  ": "_"}, "a  b"),
+    # Empty keys insert between every character
+    ({"": "-", "a": "b"}, "aa"),
+    ({"a": "b", "": "-"}, "aa"),
+])
+def test_matches_sequential_replace(mapping, text):
+    replacer = TextReplacer(mapping)
+    assert replacer.replace(text) == sequential(text, mapping)
+
+
+def test_independent_entries_share_a_pass():
+    mapping = {"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"}
+    replacer = TextReplacer(mapping)
+    assert len(replacer.stages) == 1
+    assert replacer.replace("Größenmaß über") == "Groessenmass ueber"
+
+
+def test_nan_and_non_string_values():
+    replacer = TextReplacer({"1": "one", "True": "yes"})
+
+    assert replacer(None) == ""
+    assert replacer(np.nan) == ""
+    assert replacer(pd.NA) == ""
+    assert replacer(12) == "one2"
+    assert replacer(1.5) == "one.5"
+    assert replacer(True) == "yes"
+    assert replace_text(np.nan, {"a": "b"}) == ""
+
+
+def test_replace_text_accepts_dict_or_replacer():
+    mapping = {"a": "b", "b": "c"}
+    assert replace_text("abc", mapping) == replace_text("abc", TextReplacer(mapping)) == "ccc"
+
+
+@pytest.mark.parametrize("values", [
+    ["ab", "ba", None, "ab", np.nan, ""],
+    [1, 1.0, "1", None, True],
+    [None, None],
+])
+def test_replace_series_matches_apply(values):
+    replacer = TextReplacer({"a": "x", "1": "one", "x": "y"})
+    series = pd.Series(values, index=range(10, 10 + len(values)), dtype=object)
+
+    result = replacer.replace_series(series)
+
+    pd.testing.assert_series_equal(result, series.apply(replacer), check_dtype=False)
+    assert list(result.index) == list(series.index)
+
+
+def test_random_mappings_match_sequential_replace():
+    rng = random.Random(42)
+    alphabet = "ab-c "
+
+    def word(min_length, max_length):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(min_length, max_length)))
+
+    for _ in range(300):
+        mapping = {word(1, 3): word(0, 3) for _ in range(rng.randint(1, 6))}
+        replacer = TextReplacer(mapping)
+        for _ in range(5):
+            text = word(0, 12)
+            assert replacer.replace(text) == sequential(text, mapping), (mapping, text)
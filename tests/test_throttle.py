@@ -0,0 +1,107 @@
+import asyncio
+import threading
+
+import pytest
+import requests
+from simple_salesforce.exceptions import SalesforceGeneralError, SalesforceMalformedRequest
+
+from vdmc_salesforce_migration.api.bulk2 import Bulk2Error
+from vdmc_salesforce_migration.api.throttle import AdaptiveRateController, is_throttle_error
+
+URL = "https://example.my.salesforce.com/services/data/v59.0/sobjects/Account"
+
+
+def _http_error(status, body):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode()
+    return requests.HTTPError(response=response)
+
+
+def test_throttling_status_codes():
+    assert is_throttle_error(SalesforceGeneralError(URL, 503, "Account", b""))
+    assert is_throttle_error(_http_error(429, ""))
+    assert is_throttle_error(Bulk2Error("PUT failed (429)", status=429, content=""))
+
+
+def test_throttling_error_codes():
+    body = '[{"errorCode": "REQUEST_LIMIT_EXCEEDED", "message": "TotalRequests Limit exceeded."}]'
+    assert is_throttle_error(SalesforceGeneralError(URL, 403, "Account", [{"errorCode": "REQUEST_LIMIT_EXCEEDED"}]))
+    assert is_throttle_error(_http_error(403, body))
+    assert is_throttle_error(Bulk2Error("failed", status=403, content=body))
+
+
+def test_numbers_in_messages_are_not_throttling():
+    body = '[{"errorCode": "DUPLICATE_VALUE", "message": "duplicate value found: vDMC_SugarExternalId__c=4291"}]'
+    assert not is_throttle_error(SalesforceMalformedRequest(URL, 400, "Account", [{"errorCode": "INVALID_ID", "message": "row 429"}]))
+    assert not is_throttle_error(_http_error(400, body))
+    assert not is_throttle_error(Bulk2Error(f"POST {URL} failed (400): {body}", status=400, content=body))
+    assert not is_throttle_error(ValueError("record 0010000000429AAA not found"))
+
+
+def test_async_slot_parks_waiters_until_a_slot_frees():
+    controller = AdaptiveRateController(initial_concurrency=2, max_concurrency=2)
+    active, peak = 0, 0
+
+    async def request():
+        nonlocal active, peak
+        async with controller.async_slot():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(request() for _ in range(20)))
+        # Waiters are futures woken on release, not polling tasks
+        assert not controller._async_waiters
+
+    asyncio.run(main())
+    assert peak == 2
+    assert controller.in_flight == 0
+
+
+def test_async_slot_is_woken_by_a_thread_release():
+    controller = AdaptiveRateController(initial_concurrency=1, max_concurrency=1)
+    taken, release = threading.Event(), threading.Event()
+
+    def hold_slot():
+        with controller.slot():
+            taken.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold_slot)
+    thread.start()
+    taken.wait()
+
+    async def main():
+        waiter = asyncio.ensure_future(_acquire(controller))
+        await asyncio.sleep(0.05)
+        assert not waiter.done() and len(controller._async_waiters) == 1
+        release.set()
+        await asyncio.wait_for(waiter, timeout=2)
+
+    asyncio.run(main())
+    thread.join()
+    assert controller.in_flight == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    controller = AdaptiveRateController(initial_concurrency=1, max_concurrency=1)
+
+    async def main():
+        async with controller.async_slot():
+            waiter = asyncio.ensure_future(_acquire(controller))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        assert not controller._async_waiters
+        await asyncio.wait_for(_acquire(controller), timeout=1)
+
+    asyncio.run(main())
+
+
+async def _acquire(controller):
+    async with controller.async_slot():
+        pass
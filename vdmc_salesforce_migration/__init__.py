@@ -8,8 +8,9 @@ This file exposes the public API for:
 - File loading
 - Data cleaning
 - SOQL lookup helpers
-- Uploading (REST, Bulk, parallel)
+- Uploading (REST, Bulk, parallel, Composite Graph)
 - Asset activation API
+- Org cleanup
 """
 
 # ------------------------------------------------------
@@ -45,12 +46,18 @@ from .utils.cleaning import (
     convert_datetime,
     clean_emails,
     sanitize_field,
+    sanitize_series,
     extract_email,
     extract_email_from_field,
     clean_numeric_fields,
     replace_text,
+    TextReplacer,
     replace_ids_in_list,
+    replace_ids_series,
     join_related_fields,
+    join_related_columns,
+    compile_cleaning_plan,
+    CleaningPlan,
 )
 
 # ------------------------------------------------------
@@ -63,8 +70,12 @@ from .utils.soql import (
     get_external_by_sf_id,
     get_sf_id_by_external,
     get_record_types,
-    query_all_records
+    query_all_records,
+    iter_record_ids,
+    iter_query,
+    resolve_references
 )
+from .utils.idmap import IdMap
 
 # ------------------------------------------------------
 # Upload Utilities
@@ -78,6 +89,17 @@ from .api.uploader import (
     deactivate_records,
     cleanup_sobject
 )
+from .api.cleanup import (
+    cleanup_org,
+    describe_objects,
+)
+from .api.graph import (
+    upload_graph_to_sf,
+)
+from .api.async_uploader import (
+    upload_to_sf_rest_async,
+    upload_rest_async,
+)
 
 # ------------------------------------------------------
 # Public API
@@ -101,12 +123,18 @@ __all__ = [
     "convert_datetime",
     "clean_emails",
     "sanitize_field",
+    "sanitize_series",
     "extract_email",
     "extract_email_from_field",
     "clean_numeric_fields",
     "replace_text",
+    "TextReplacer",
     "replace_ids_in_list",
+    "replace_ids_series",
     "join_related_fields",
+    "join_related_columns",
+    "compile_cleaning_plan",
+    "CleaningPlan",
 
     # SOQL
     "query_to_nested_map",
@@ -116,6 +144,10 @@ __all__ = [
     "get_sf_id_by_external",
     "get_record_types",
     "query_all_records",
+    "iter_record_ids",
+    "iter_query",
+    "resolve_references",
+    "IdMap",
 
     # Upload
     "upload_to_sf_rest",
@@ -124,5 +156,10 @@ __all__ = [
     "upload_rest_parallel",
     "activate_assets_via_api",
     "deactivate_records",
-    "cleanup_sobject"
+    "cleanup_sobject",
+    "cleanup_org",
+    "describe_objects",
+    "upload_graph_to_sf",
+    "upload_to_sf_rest_async",
+    "upload_rest_async"
 ]
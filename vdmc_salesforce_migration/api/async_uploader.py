@@ -0,0 +1,225 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import quote
+
+try:
+    import httpx
+except ImportError:  # optional dependency: pip install "vdmc-salesforce-migration[async]"
+    httpx = None
+
+from simple_salesforce import Salesforce
+
+from vdmc_salesforce_migration.utils.logging import open_csv_log, CsvLogWriter
+from vdmc_salesforce_migration.utils.config_loader import get_log_dir, get_default_env
+from vdmc_salesforce_migration.utils.checkpoint import open_rest_checkpoint
+from vdmc_salesforce_migration.utils.records import clean_payload
+from vdmc_salesforce_migration.api.auth import get_salesforce_client, refresh_session
+from vdmc_salesforce_migration.api.throttle import get_async_rate_controller, is_throttle_response, parse_limit_info
+
+root_dir = Path(__file__).resolve().parent.parent.parent
+log_dir = root_dir / get_log_dir()
+env = get_default_env()
+
+# Result rows buffered between the workers and the log writer thread
+LOG_QUEUE_SIZE = 10000
+
+
+class AsyncUploadError(Exception):
+    """Raised when the async engine cannot run (e.g. httpx is missing)."""
+    pass
+
+
+def _require_httpx():
+    if httpx is None:
+        raise AsyncUploadError(
+            "The async REST engine requires httpx: "
+            'pip install "vdmc-salesforce-migration[async]"'
+        )
+
+
+async def _send_record(
+    http: "httpx.AsyncClient",
+    client: Salesforce,
+    object_name: str,
+    record: Dict[str, Any],
+    external_identifier: str = None,
+    id_field: str = None,
+) -> list:
+    """
+    Create or upsert one record and return its log row.
+    Each request holds a slot of the async rate controller and reports
+    success or throttling to it; throttled requests are retried with
+    jittered backoff, an expired session is refreshed once.
+    """
+    controller = get_async_rate_controller()
+    external_value = record.get(id_field, "") if id_field else ""
+
+    payload = clean_payload(record, [id_field, external_identifier])
+
+    if external_identifier:
+        key = quote(str(record.get(external_identifier, "")), safe="")
+        method, path = "PATCH", f"sobjects/{object_name}/{external_identifier}/{key}"
+    else:
+        method, path = "POST", f"sobjects/{object_name}/"
+
+    refreshed = False
+    attempt = 0
+    while True:
+        session_id = client.session_id
+        try:
+            async with controller.async_slot():
+                response = await http.request(
+                    method,
+                    path,
+                    json=payload,
+                    headers={"Authorization": f"Bearer {session_id}"}
+                )
+        except httpx.HTTPError as e:
+            return [external_value, "", False, f"Exception: {e}"]
+
+        if response.status_code == 401 and not refreshed:
+            await asyncio.to_thread(refresh_session, client, session_id)
+            refreshed = True
+            continue
+
+        if is_throttle_response(response.status_code, response.text):
+            controller.on_throttle()
+            if attempt < controller.max_retries:
+                await asyncio.sleep(controller.backoff_delay(attempt))
+                attempt += 1
+                continue
+        elif response.status_code < 300:
+            controller.on_success(parse_limit_info(response.headers.get("Sforce-Limit-Info")))
+        break
+
+    if response.status_code >= 300:
+        return [external_value, "", False, response.text]
+
+    # Upserts of existing records may answer 204 without a body
+    body = response.json() if response.content else {}
+    errors = ";".join(str(e) for e in body.get("errors", []))
+    return [external_value, body.get("id", ""), body.get("success", True), errors]
+
+
+async def upload_to_sf_rest_async(
+    client: Salesforce,
+    object_name: str,
+    data: Iterable[Dict[str, Any]],
+    external_identifier: str = None,
+    id_field: str = None,
+    max_in_flight: int = None,
+    log_writer: Optional[CsvLogWriter] = None,
+    run_id: str = None,
+):
+    """
+    Async counterpart of upload_to_sf_rest (one request per record).
+
+    <max_in_flight> worker coroutines (default: the async controller's
+    max_concurrency, async_rate_control in config.yaml) pull records from
+    <data> and share a single httpx connection pool; how many requests
+    actually run at once is decided by the async rate controller, which
+    shrinks its window on throttling. Records are consumed lazily, and
+    results are handed to a log coroutine that writes them in batches on
+    a worker thread, so file I/O never blocks the event loop.
+
+    Upserts match on <external_identifier>, whose value must be in each record.
+    Only client.base_url and client.session_id are used, so a stand-in
+    object pointing at a local HTTP server works for testing.
+
+    With a <run_id>, completed <id_field> values are checkpointed and
+    skipped when the run is restarted.
+    """
+    _require_httpx()
+
+    if max_in_flight is None:
+        max_in_flight = get_async_rate_controller().max_concurrency
+
+    checkpoint = None
+    if run_id:
+        checkpoint = open_rest_checkpoint(log_dir, env, run_id, object_name, id_field)
+        data = checkpoint.skip_completed(data, id_field)
+
+    own_log = log_writer is None
+    if own_log:
+        log_writer = open_csv_log(
+            base_dir=Path(log_dir),
+            object_name=object_name,
+            prefix="id_write",
+            env=env,
+            header=["external_id", "sf_id", "success", "errors"],
+            run_id=run_id
+        )
+    row_writer = checkpoint.wrap_log(log_writer) if checkpoint else log_writer
+
+    records = iter(data)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    # Log rows on their way to the writer thread; None ends the log coroutine
+    rows: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+
+    async def _worker(http):
+        for record in records:
+            row = await _send_record(http, client, object_name, record, external_identifier, id_field)
+            await rows.put(row)
+
+    async def _log_rows():
+        while True:
+            batch = [await rows.get()]
+            while not rows.empty():
+                batch.append(rows.get_nowait())
+            done = batch[-1] is None
+            batch = [row for row in batch if row is not None]
+            if batch:
+                await asyncio.to_thread(row_writer.write_rows, batch)
+            if done:
+                return
+
+    try:
+        async with httpx.AsyncClient(base_url=client.base_url, limits=limits, timeout=120) as http:
+            logger = asyncio.create_task(_log_rows())
+            workers = asyncio.gather(*(_worker(http) for _ in range(max_in_flight)))
+            try:
+                await asyncio.wait({logger, workers}, return_when=asyncio.FIRST_COMPLETED)
+                if logger.done():
+                    # The log coroutine only ends early when a write failed
+                    workers.cancel()
+                    logger.result()
+                await workers
+            finally:
+                if not logger.done():
+                    await rows.put(None)
+                    await logger
+    finally:
+        if own_log:
+            log_writer.close()
+        if checkpoint:
+            checkpoint.close()
+
+    print(f"[REST-ASYNC] Upload done for {object_name}. Log file: {log_writer.file_path}")
+
+
+def upload_rest_async(
+    object_name: str,
+    data: Iterable[Dict[str, Any]],
+    external_identifier: str = None,
+    id_field: str = None,
+    max_in_flight: int = None,
+    client: Salesforce = None,
+    run_id: str = None,
+):
+    """
+    Synchronous entry point for the async engine, the counterpart of
+    upload_rest_parallel. Logs in once unless <client> is given.
+    """
+    if client is None:
+        client = get_salesforce_client()
+
+    asyncio.run(upload_to_sf_rest_async(
+        client=client,
+        object_name=object_name,
+        data=data,
+        external_identifier=external_identifier,
+        id_field=id_field,
+        max_in_flight=max_in_flight,
+        run_id=run_id,
+    ))
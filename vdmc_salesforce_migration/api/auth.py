@@ -1,5 +1,8 @@
 import os
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from simple_salesforce import Salesforce, SalesforceLogin
 from ..credentials import load_credentials
 from vdmc_salesforce_migration.utils.config_loader import get_default_env, get_default_api_version
@@ -54,6 +57,52 @@ def get_salesforce_client():
     return client
 
 
+_refresh_lock = threading.Lock()
+
+# A refresh this recent means a 401 came from a request sent with the old token
+REFRESH_GRACE_SECONDS = 30
+
+
+def refresh_session(client: Salesforce, stale_session_id: str = None):
+    """
+    Log in again and update the client's session id and headers.
+
+    Safe to call from many threads: if the session changed since
+    <stale_session_id> was read (or, without it, was refreshed in the last
+    REFRESH_GRACE_SECONDS), another thread already refreshed it and
+    nothing is done.
+    """
+    with _refresh_lock:
+        if stale_session_id is not None:
+            if client.session_id != stale_session_id:
+                return
+        elif time.monotonic() - getattr(client, "_vdmc_refreshed_at", float("-inf")) < REFRESH_GRACE_SECONDS:
+            return
+
+        _login_refresh = getattr(client, "_vdmc_login_refresh", client._refresh_session)
+        _login_refresh()
+        client._vdmc_refreshed_at = time.monotonic()
+        print("Salesforce session refreshed.")
+
+
+def configure_shared_client(client: Salesforce, pool_size: int) -> Salesforce:
+    """
+    Prepare one authenticated client to be shared by <pool_size> threads:
+      - mounts an HTTPAdapter whose keep-alive pool holds <pool_size> connections
+      - serializes session refreshes so expired tokens trigger a single re-login
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    client.session.mount("https://", adapter)
+
+    # simple_salesforce re-logs in on INVALID_SESSION_ID from every thread
+    # that sees it; route those refreshes through the shared lock instead
+    if not hasattr(client, "_vdmc_login_refresh"):
+        client._vdmc_login_refresh = client._refresh_session
+        client._refresh_session = lambda: refresh_session(client)
+
+    return client
+
+
 def _fetch_latest_api_version(domain: str) -> str:
     """
     Fetch the latest API version from Salesforce.
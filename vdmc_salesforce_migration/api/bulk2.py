@@ -0,0 +1,490 @@
+import csv
+import io
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import requests
+from simple_salesforce import Salesforce
+
+from vdmc_salesforce_migration.api.http import sf_request
+from vdmc_salesforce_migration.utils.checkpoint import Checkpoint
+
+# Terminal states of a Bulk API 2.0 job
+TERMINAL_STATES = ("JobComplete", "Failed", "Aborted")
+
+
+class Bulk2Error(Exception):
+    """
+    Raised when a Bulk API 2.0 request fails. <status> and <content> hold
+    the HTTP status and response body of failed requests.
+    """
+
+    def __init__(self, message: str, status: int = None, content: str = None):
+        super().__init__(message)
+        self.status = status
+        self.content = content
+
+
+class IngestError(Bulk2Error):
+    """
+    Raised by run_ingest when payloads failed to upload. Carries the final
+    info of the jobs that did run (results) and (payload index, exception)
+    per failed payload (failed_payloads).
+    """
+
+    def __init__(self, message: str, results: List[Dict[str, Any]], failed_payloads: List[Tuple[int, Exception]]):
+        super().__init__(message)
+        self.results = results
+        self.failed_payloads = failed_payloads
+
+
+def _jobs_url(client: Salesforce, path: str = "") -> str:
+    """
+    Build a Bulk API 2.0 URL from the client's base URL.
+    Example: <instance>/services/data/vXX.X/jobs/ingest/<job_id>
+    """
+    return f"{client.base_url}jobs/{path}"
+
+
+def _request(client: Salesforce, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request via sf_request (throttling + session refresh)
+    and raise Bulk2Error on failure.
+    """
+    response = sf_request(client, method, url, **kwargs)
+
+    if response.status_code >= 300:
+        raise Bulk2Error(
+            f"{method} {url} failed ({response.status_code}): {response.text}",
+            status=response.status_code,
+            content=response.text,
+        )
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Ingest jobs
+# ---------------------------------------------------------------------------
+def create_ingest_job(
+    client: Salesforce,
+    object_name: str,
+    operation: str,
+    external_id_field: str = None,
+) -> Dict[str, Any]:
+    """
+    Create an ingest job (insert, upsert, update, delete, hardDelete).
+    """
+    payload = {
+        "object": object_name,
+        "operation": operation,
+        "contentType": "CSV",
+        "lineEnding": "LF",
+    }
+    if external_id_field:
+        payload["externalIdFieldName"] = external_id_field
+
+    return _request(client, "POST", _jobs_url(client, "ingest"), json=payload).json()
+
+
+def upload_job_data(client: Salesforce, job_id: str, payload: bytes):
+    """
+    Upload one CSV payload to an open ingest job.
+    """
+    _request(
+        client,
+        "PUT",
+        _jobs_url(client, f"ingest/{job_id}/batches"),
+        data=payload,
+        headers={"Content-Type": "text/csv"},
+    )
+
+
+def _set_job_state(client: Salesforce, job_id: str, state: str) -> Dict[str, Any]:
+    return _request(
+        client,
+        "PATCH",
+        _jobs_url(client, f"ingest/{job_id}"),
+        json={"state": state},
+    ).json()
+
+
+def close_job(client: Salesforce, job_id: str) -> Dict[str, Any]:
+    """Mark the upload as complete so Salesforce starts processing the job."""
+    return _set_job_state(client, job_id, "UploadComplete")
+
+
+def abort_job(client: Salesforce, job_id: str) -> Dict[str, Any]:
+    """Abort an open or in-progress ingest job."""
+    return _set_job_state(client, job_id, "Aborted")
+
+
+def get_job(client: Salesforce, job_id: str, job_type: str = "ingest") -> Dict[str, Any]:
+    """Return the current job info (state, processed/failed counts, …) of an ingest or query job."""
+    return _request(client, "GET", _jobs_url(client, f"{job_type}/{job_id}")).json()
+
+
+def wait_for_job(
+    client: Salesforce,
+    job_id: str,
+    poll_interval: float = 2.0,
+    max_poll_interval: float = 30.0,
+    job_type: str = "ingest",
+) -> Dict[str, Any]:
+    """
+    Poll a job with exponential backoff until it reaches a terminal state.
+    """
+    interval = poll_interval
+    while True:
+        info = get_job(client, job_id, job_type)
+        if info["state"] in TERMINAL_STATES:
+            return info
+        time.sleep(interval)
+        interval = min(interval * 2, max_poll_interval)
+
+
+# ---------------------------------------------------------------------------
+# Query jobs
+# ---------------------------------------------------------------------------
+def create_query_job(client: Salesforce, soql: str, include_deleted: bool = False) -> Dict[str, Any]:
+    """
+    Create a query job (queryAll with <include_deleted>). Results are CSV with LF line endings.
+    """
+    payload = {
+        "operation": "queryAll" if include_deleted else "query",
+        "query": soql,
+        "contentType": "CSV",
+        "lineEnding": "LF",
+    }
+    return _request(client, "POST", _jobs_url(client, "query"), json=payload).json()
+
+
+def iter_query_pages(
+    client: Salesforce,
+    job_id: str,
+    page_size: int = 100000,
+) -> Iterator[str]:
+    """
+    Yield the result pages of a completed query job as CSV text (each
+    with its own header line), following the Sforce-Locator header.
+    Only one page is held in memory at a time.
+    """
+    locator = None
+    while True:
+        params = {"maxRecords": page_size}
+        if locator:
+            params["locator"] = locator
+
+        response = _request(
+            client, "GET", _jobs_url(client, f"query/{job_id}/results"), params=params
+        )
+        yield response.text
+
+        locator = response.headers.get("Sforce-Locator")
+        if not locator or locator == "null":
+            return
+
+
+def _prefetch(pages: Iterator[str], depth: int = 2) -> Iterator[str]:
+    """
+    Download pages in a background thread while the caller parses the
+    previous ones. Locators are chained (each page names the next), so
+    downloads cannot run in parallel with each other, only with parsing.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def _download():
+        try:
+            for page in pages:
+                if stop.is_set():
+                    return
+                buffer.put(page)
+            buffer.put(done)
+        except Exception as e:
+            buffer.put(e)
+
+    thread = threading.Thread(target=_download, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Unblock the downloader if the caller stopped early
+        stop.set()
+        while thread.is_alive():
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                thread.join(0.1)
+
+
+def run_query(
+    client: Salesforce,
+    soql: str,
+    page_size: int = 100000,
+    include_deleted: bool = False,
+    poll_interval: float = 2.0,
+    max_poll_interval: float = 30.0,
+    prefetch: bool = True,
+) -> Iterator[Dict[str, str]]:
+    """
+    Run a Bulk API 2.0 query and yield its rows as dicts of strings,
+    streamed page by page (Salesforce returns empty fields as "").
+    Nested fields keep their SOQL path as column name, e.g. "Account.Name".
+
+    With <prefetch>, the next page downloads while the current one is parsed.
+    """
+    job_id = create_query_job(client, soql, include_deleted)["id"]
+    info = wait_for_job(client, job_id, poll_interval, max_poll_interval, job_type="query")
+    if info["state"] != "JobComplete":
+        raise Bulk2Error(f"Query job {job_id} {info['state']}: {info.get('errorMessage', '')}")
+
+    pages = iter_query_pages(client, job_id, page_size)
+    if prefetch:
+        pages = _prefetch(pages)
+
+    for page in pages:
+        yield from csv.DictReader(io.StringIO(page))
+
+
+def get_failed_results(client: Salesforce, job_id: str) -> bytes:
+    """
+    Download the failed results CSV of a job
+    (columns: sf__Id, sf__Error, <original columns>).
+    """
+    return _request(client, "GET", _jobs_url(client, f"ingest/{job_id}/failedResults")).content
+
+
+def write_failed_results(client: Salesforce, job_id: str, file: Path):
+    """Write the failed results CSV of a job to <file>."""
+    with open(file, "wb") as f:
+        f.write(get_failed_results(client, job_id))
+
+
+def _submit_ingest_job(
+    client: Salesforce,
+    object_name: str,
+    operation: str,
+    payload: bytes,
+    external_id_field: str = None,
+) -> str:
+    """
+    Create a job, upload its payload and close it. Returns the job id.
+    The job is aborted if the upload fails.
+    """
+    job_id = create_ingest_job(client, object_name, operation, external_id_field)["id"]
+
+    try:
+        upload_job_data(client, job_id, payload)
+        close_job(client, job_id)
+    except Exception:
+        abort_job(client, job_id)
+        raise
+
+    return job_id
+
+
+def failed_rows_payload(client: Salesforce, job_id: str) -> Tuple[bytes, int]:
+    """
+    Rebuild an ingest payload from the failed rows of <job_id>, without
+    the sf__Id / sf__Error result columns. Returns (payload, record_count).
+    """
+    reader = csv.reader(io.StringIO(get_failed_results(client, job_id).decode("utf-8")))
+    header = next(reader, [])
+    keep = [i for i, name in enumerate(header) if not name.startswith("sf__")]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([header[i] for i in keep])
+    record_count = 0
+    for row in reader:
+        writer.writerow([row[i] for i in keep])
+        record_count += 1
+
+    return buffer.getvalue().encode("utf-8"), record_count
+
+
+def _resume_action(previous: Dict[str, Any] = None) -> str:
+    """
+    What to do with a checkpointed payload: "skip" (job complete),
+    "retry" (job complete with failed rows, which are submitted again),
+    "attach" (job still processing) or "submit" (new, failed, aborted or
+    never uploaded).
+    """
+    if not previous:
+        return "submit"
+    if previous["state"] == "JobComplete":
+        return "retry" if previous.get("records_failed") else "skip"
+    if previous["state"] in TERMINAL_STATES or not previous.get("job_id"):
+        return "submit"
+    return "attach"
+
+
+def run_ingest(
+    client: Salesforce,
+    object_name: str,
+    operation: str,
+    payloads: Iterable[Tuple[bytes, int]],
+    external_id_field: str = None,
+    max_concurrent_jobs: int = 1,
+    poll_interval: float = 2.0,
+    max_poll_interval: float = 30.0,
+    checkpoint: Checkpoint = None,
+) -> List[Dict[str, Any]]:
+    """
+    Job scheduler for Bulk API 2.0 ingest.
+
+    Keeps up to <max_concurrent_jobs> jobs open at once: payloads are
+    uploaded in worker threads while a single loop polls all processing
+    jobs, backing off exponentially while nothing changes.
+
+    Payloads are consumed lazily, so at most <max_concurrent_jobs> are in
+    memory at a time. Returns the final job info of every job, in the
+    order the jobs finished.
+
+    If a payload fails to upload, no further payloads are started, the
+    jobs already processing are polled to the end and IngestError is
+    raised with their results. Any other error aborts the processing jobs.
+
+    With a <checkpoint>, every job is recorded under its payload index
+    and the payload's hash. A re-run over the same input skips payloads
+    whose job completed, re-submits only the failed rows of completed
+    jobs, re-attaches to jobs that were still processing and submits
+    failed, aborted or never uploaded payloads again. A payload whose hash
+    differs from the checkpoint raises CheckpointError.
+    """
+    payload_iter = enumerate(payloads)
+    exhausted = False
+    results = []
+    failed_payloads = []
+
+    uploading = {}   # future -> (payload index, record count)
+    processing = {}  # job id -> (payload index, record count)
+    interval = poll_interval
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_jobs) as executor:
+        try:
+            while True:
+                # Fill free slots with new jobs (none after an upload failed)
+                while not exhausted and not failed_payloads and len(uploading) + len(processing) < max_concurrent_jobs:
+                    try:
+                        index, (payload, record_count) = next(payload_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+
+                    previous = None
+                    if checkpoint:
+                        checkpoint.bind_payload(index, payload)
+                        previous = checkpoint.get_job(index)
+                    action = _resume_action(previous)
+                    if action == "skip":
+                        print(f"[BULK] Payload {index} already done in job {previous['job_id']}, skipped")
+                        continue
+                    if action == "retry":
+                        payload, record_count = failed_rows_payload(client, previous["job_id"])
+                        if not record_count:
+                            continue
+                        print(
+                            f"[BULK] Payload {index}: re-submitting the {record_count} failed rows "
+                            f"of job {previous['job_id']}"
+                        )
+                    if action == "attach":
+                        print(f"[BULK] Re-attaching to job {previous['job_id']} (payload {index})")
+                        processing[previous["job_id"]] = (index, record_count)
+                        continue
+                    if previous:
+                        print(f"[BULK] Payload {index} ended {previous['state']} in job {previous['job_id']}, re-submitting")
+
+                    future = executor.submit(
+                        _submit_ingest_job,
+                        client, object_name, operation, payload, external_id_field
+                    )
+                    uploading[future] = (index, record_count)
+
+                if not uploading and not processing:
+                    break
+
+                # Wait for an upload to finish, or sleep until the next poll
+                if uploading:
+                    done, _ = wait(uploading, timeout=interval, return_when=FIRST_COMPLETED)
+                else:
+                    done = set()
+                    time.sleep(interval)
+
+                for future in done:
+                    index, record_count = uploading.pop(future)
+                    try:
+                        job_id = future.result()
+                    except Exception as e:
+                        print(f"[BULK] ❌ Upload of payload {index} ({record_count} records) failed: {e}")
+                        failed_payloads.append((index, e))
+                        if checkpoint:
+                            checkpoint.record_job(index, None, "UploadFailed")
+                        continue
+
+                    processing[job_id] = (index, record_count)
+                    if checkpoint:
+                        checkpoint.record_job(index, job_id, "UploadComplete")
+
+                # Poll all processing jobs in one sweep
+                finished = []
+                for job_id, (index, record_count) in processing.items():
+                    info = get_job(client, job_id)
+                    if info["state"] not in TERMINAL_STATES:
+                        continue
+
+                    print(
+                        f"[BULK] Job {job_id} {info['state']}: "
+                        f"{info.get('numberRecordsProcessed', 0)}/{record_count} processed, "
+                        f"{info.get('numberRecordsFailed', 0)} failed"
+                    )
+                    results.append(info)
+                    finished.append((index, job_id, info["state"], info.get("numberRecordsFailed", 0)))
+
+                for index, job_id, state, records_failed in finished:
+                    del processing[job_id]
+                    if checkpoint:
+                        checkpoint.record_job(index, job_id, state, records_failed=records_failed)
+
+                # Back off while nothing changes
+                interval = poll_interval if done or finished else min(interval * 2, max_poll_interval)
+
+        except BaseException:
+            # Do not leave jobs running unobserved: wait for started uploads, abort all open jobs
+            for future, (index, record_count) in uploading.items():
+                if future.cancel():
+                    continue
+                try:
+                    processing[future.result()] = (index, record_count)
+                except Exception:
+                    pass
+            for job_id, (index, _) in processing.items():
+                try:
+                    abort_job(client, job_id)
+                    print(f"[BULK] Aborted job {job_id} (payload {index})")
+                    if checkpoint:
+                        checkpoint.record_job(index, job_id, "Aborted")
+                except Exception as e:
+                    print(f"[BULK] Could not abort job {job_id}: {e}")
+            raise
+
+    if failed_payloads:
+        raise IngestError(
+            f"{len(failed_payloads)} payload(s) of {object_name} failed to upload: "
+            f"{[index for index, _ in failed_payloads]}",
+            results,
+            failed_payloads,
+        ) from failed_payloads[0][1]
+
+    return results
@@ -0,0 +1,229 @@
+import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Any, Dict, List, Set, Union
+
+from simple_salesforce import Salesforce
+
+from vdmc_salesforce_migration.utils.config_loader import get_cleanup_max_workers
+from vdmc_salesforce_migration.api.auth import configure_shared_client
+from vdmc_salesforce_migration.api.throttle import get_rate_controller, sf_usage
+from vdmc_salesforce_migration.api.uploader import cleanup_sobject
+
+Describes = Union[Dict[str, Dict[str, Any]], str, Path]
+
+
+class CleanupError(Exception):
+    """
+    Raised when the delete order of a set of objects cannot be resolved;
+    also recorded for an object whose records could not all be deleted.
+    """
+    pass
+
+
+# ------------------------------------------------------------------
+# Describe metadata
+# ------------------------------------------------------------------
+def describe_objects(
+    client: Salesforce,
+    object_names: List[str],
+    file: Union[str, Path] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch the describe of every object, optionally saving them as JSON
+    to <file> so the delete order can be rebuilt offline (see cleanup_org).
+    """
+    controller = get_rate_controller()
+    describes = {
+        name: controller.call(
+            lambda name=name: client.restful(f"sobjects/{name}/describe"),
+            usage=sf_usage(client)
+        )
+        for name in object_names
+    }
+
+    if file:
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump(describes, f)
+
+    return describes
+
+
+def _load_describes(client: Salesforce, object_names: List[str], describes: Describes = None):
+    if describes is None:
+        return describe_objects(client, object_names)
+    if isinstance(describes, (str, Path)):
+        with open(describes, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return describes
+
+
+# ------------------------------------------------------------------
+# Dependency graph
+# ------------------------------------------------------------------
+def build_dependencies(
+    describes: Dict[str, Dict[str, Any]],
+    object_names: List[str],
+) -> Dict[str, Dict[str, bool]]:
+    """
+    Return {parent: {child: hard}} for every lookup / master-detail field of
+    a child in <object_names> that references another object in the list.
+
+    An edge is "hard" unless the lookup is nillable and neither cascades
+    nor restricts the delete, i.e. deleting the parent first would fail or
+    cascade into the child. Self references (hierarchies) are ignored.
+    """
+    wanted = set(object_names)
+    missing = wanted - set(describes)
+    if missing:
+        raise CleanupError(f"No describe metadata for: {sorted(missing)}")
+
+    dependencies: Dict[str, Dict[str, bool]] = {name: {} for name in object_names}
+
+    for child in object_names:
+        for field in describes[child].get("fields", []):
+            if field.get("type") != "reference":
+                continue
+
+            hard = (
+                not field.get("nillable", True)
+                or field.get("cascadeDelete", False)
+                or field.get("restrictedDelete", False)
+            )
+            for parent in field.get("referenceTo") or []:
+                if parent == child or parent not in wanted:
+                    continue
+                dependencies[parent][child] = dependencies[parent].get(child, False) or hard
+
+    return dependencies
+
+
+def _reaches(edges: Dict[str, Set[str]], start: str, target: str) -> bool:
+    """True if <target> can be reached from <start> along <edges>."""
+    seen, stack = set(), [start]
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        if node not in seen:
+            seen.add(node)
+            stack.extend(edges[node])
+    return False
+
+
+def _resolve_cycles(object_names: List[str], dependencies: Dict[str, Dict[str, bool]]) -> Dict[str, Set[str]]:
+    """
+    Return {parent: children still to delete first}, with the soft edges
+    between objects stuck in a cycle dropped. Checked up front so nothing
+    is deleted when the order cannot be resolved.
+    """
+    waiting_on = {parent: set(children) for parent, children in dependencies.items()}
+    remaining = {parent: set(children) for parent, children in waiting_on.items()}
+    pending = set(object_names)
+
+    while pending:
+        ready = {name for name in pending if not remaining[name]}
+        if ready:
+            pending -= ready
+            for children in remaining.values():
+                children -= ready
+            continue
+
+        dropped = False
+        for parent in pending:
+            for child in list(remaining[parent]):
+                if not dependencies[parent][child] and _reaches(remaining, child, parent):
+                    remaining[parent].discard(child)
+                    waiting_on[parent].discard(child)
+                    dropped = True
+        if not dropped:
+            raise CleanupError(f"Cyclic hard dependencies between: {sorted(pending)}")
+
+    return waiting_on
+
+
+def _skip_parents(failed: str, waiting_on: Dict[str, Set[str]], pending: Set[str], results: Dict[str, str]):
+    """
+    Mark every pending object that still waits on <failed> (directly or via
+    another skipped object) as skipped, so no parent is deleted before its
+    children are gone.
+    """
+    stack = [failed]
+    while stack:
+        child = stack.pop()
+        for parent in [name for name in pending if child in waiting_on[name]]:
+            pending.discard(parent)
+            results[parent] = f"skipped: child {child} failed"
+            print(f"[CLEANUP] {parent} skipped: child {child} failed")
+            stack.append(parent)
+
+
+# ------------------------------------------------------------------
+# Orchestrator
+# ------------------------------------------------------------------
+def cleanup_org(
+    client: Salesforce,
+    object_names: List[str],
+    max_workers: int = None,
+    describes: Describes = None,
+) -> Dict[str, str]:
+    """
+    Delete all records of <object_names>, children before parents.
+
+    The delete order is derived from describe metadata: an object is
+    cleaned (via cleanup_sobject) once every listed object that looks it
+    up is done, and up to <max_workers> independent objects run at once.
+    Cycles are broken at nillable lookups; cycles made only of required,
+    cascade or restricted lookups raise CleanupError. When an object fails,
+    or cleanup_sobject leaves records behind, the objects waiting on it
+    are skipped instead of deleted.
+
+    <describes> may be a dict or a JSON file written by describe_objects,
+    so the order can be tested without an org.
+
+    Returns {object_name: "done" | "error: ..." | "skipped: ..."}.
+    """
+    if max_workers is None:
+        max_workers = get_cleanup_max_workers()
+
+    describes = _load_describes(client, object_names, describes)
+    dependencies = build_dependencies(describes, object_names)
+    waiting_on = _resolve_cycles(object_names, dependencies)
+
+    configure_shared_client(client, max_workers)
+
+    pending = set(object_names)
+    results: Dict[str, str] = {}
+
+    print(f"[CLEANUP] Deleting {len(pending)} objects with {max_workers} workers…")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+
+        while pending or running:
+            ready = [name for name in object_names if name in pending and not waiting_on[name]]
+            for name in ready:
+                pending.discard(name)
+                running[executor.submit(cleanup_sobject, client, name)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    remaining = future.result()
+                    if remaining:
+                        raise CleanupError(f"{remaining} records could not be deleted")
+                    results[name] = "done"
+                except Exception as e:
+                    results[name] = f"error: {e}"
+                    print(f"[CLEANUP] ❌ {name} failed: {e}")
+                    _skip_parents(name, waiting_on, pending, results)
+                    continue
+
+                for parent in waiting_on:
+                    waiting_on[parent].discard(name)
+
+    failed = [name for name, status in results.items() if status.startswith("error")]
+    skipped = [name for name, status in results.items() if status.startswith("skipped")]
+    print(f"[CLEANUP] Org cleanup finished. {len(failed)} objects failed: {failed}, {len(skipped)} skipped: {skipped}")
+    return results
@@ -0,0 +1,310 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from simple_salesforce import Salesforce
+
+from vdmc_salesforce_migration.utils.logging import open_csv_log
+from vdmc_salesforce_migration.utils.records import clean_payload
+from vdmc_salesforce_migration.utils.config_loader import get_log_dir, get_default_env
+from vdmc_salesforce_migration.api.throttle import get_rate_controller, sf_usage
+
+root_dir = Path(__file__).resolve().parent.parent.parent
+log_dir = root_dir / get_log_dir()
+env = get_default_env()
+
+# Composite Graph accepts at most 500 nodes per graph
+MAX_GRAPH_NODES = 500
+
+
+class GraphUploadError(Exception):
+    """Raised when a Composite Graph specification is invalid."""
+    pass
+
+
+def _upsert_node(
+    version_path: str,
+    object_name: str,
+    external_id_field: str,
+    record: Dict[str, Any],
+    reference_id: str,
+    exclude: List[str],
+) -> Dict[str, Any]:
+    """Node that upserts a record by external ID."""
+    external_value = quote(str(record[external_id_field]), safe="")
+    return {
+        "method": "PATCH",
+        "url": f"{version_path}/sobjects/{object_name}/{external_id_field}/{external_value}",
+        "referenceId": reference_id,
+        "body": clean_payload(record, exclude + [external_id_field]),
+    }
+
+
+def _lookup_node(
+    version_path: str,
+    object_name: str,
+    external_id_field: str,
+    external_value: Any,
+    reference_id: str,
+) -> Dict[str, Any]:
+    """Node that reads the Id of an existing record by external ID (no write, no row lock)."""
+    external_value = quote(str(external_value), safe="")
+    return {
+        "method": "GET",
+        "url": f"{version_path}/sobjects/{object_name}/{external_id_field}/{external_value}?fields=Id",
+        "referenceId": reference_id,
+    }
+
+
+def _create_node(
+    version_path: str,
+    object_name: str,
+    record: Dict[str, Any],
+    reference_id: str,
+    exclude: List[str],
+) -> Dict[str, Any]:
+    """Node that inserts a new record."""
+    return {
+        "method": "POST",
+        "url": f"{version_path}/sobjects/{object_name}",
+        "referenceId": reference_id,
+        "body": clean_payload(record, exclude),
+    }
+
+
+def _build_graphs(
+    version_path: str,
+    parent_object: str,
+    parents: List[Dict[str, Any]],
+    parent_external_id: str,
+    children: List[Dict[str, Any]],
+    max_graph_nodes: int,
+) -> Tuple[List[Dict[str, Any]], List[list]]:
+    """
+    Pack every parent with its children into graphs of at most <max_graph_nodes> nodes.
+    Returns (graphs, orphans): orphans are graph_write log rows for the
+    children whose parent is not in <parents>.
+
+    Each graph node list carries a side table (node_keys) of
+    referenceId -> (object, external key) for unpacking the response, and
+    the indexes of the graphs it depends on (depends_on).
+
+    A parent with more children than fit into one graph is upserted once,
+    in the graph of its first part. Later parts look the parent up by
+    external ID (read-only GET node) and depend on that first graph, so
+    they only run once the parent exists; parallel upserts of the same new
+    external ID would race (duplicates, DUPLICATE_EXTERNAL_ID, UNABLE_TO_LOCK_ROW).
+    """
+    children_by_parent: Dict[Any, List[tuple]] = {}
+    for spec in children:
+        for record in spec["records"]:
+            parent_key = record.get(spec["reference_field"])
+            children_by_parent.setdefault(parent_key, []).append((spec, record))
+
+    graphs = []
+    nodes: List[Dict[str, Any]] = []
+    node_keys: Dict[str, Optional[tuple]] = {}
+    depends_on: Set[int] = set()
+
+    def _flush():
+        nonlocal nodes, node_keys, depends_on
+        if nodes:
+            graphs.append({"nodes": nodes, "node_keys": node_keys, "depends_on": depends_on})
+        nodes, node_keys, depends_on = [], {}, set()
+
+    counter = 0
+    for parent in parents:
+        parent_key = parent[parent_external_id]
+        related = children_by_parent.pop(parent_key, [])
+
+        # Parents with more children than fit into one graph are split into parts
+        part_size = max_graph_nodes - 1
+        parts = [related[i:i + part_size] for i in range(0, len(related), part_size)] or [[]]
+        first_graph = None
+
+        for part in parts:
+            if len(nodes) + 1 + len(part) > max_graph_nodes:
+                _flush()
+
+            counter += 1
+            parent_ref = f"p{counter}"
+            if first_graph is None:
+                first_graph = len(graphs)
+                nodes.append(_upsert_node(
+                    version_path, parent_object, parent_external_id, parent, parent_ref, []
+                ))
+                node_keys[parent_ref] = (parent_object, parent_key)
+            else:
+                # Follow-up part: reference the parent upserted by the first part
+                nodes.append(_lookup_node(
+                    version_path, parent_object, parent_external_id, parent_key, parent_ref
+                ))
+                node_keys[parent_ref] = None
+                depends_on.add(first_graph)
+
+            for index, (spec, record) in enumerate(part):
+                child_ref = f"{parent_ref}c{index}"
+                exclude = [spec["reference_field"]]
+                child_external_id = spec.get("external_id")
+
+                if child_external_id:
+                    node = _upsert_node(
+                        version_path, spec["object"], child_external_id, record, child_ref, exclude
+                    )
+                    child_key = record[child_external_id]
+                else:
+                    node = _create_node(version_path, spec["object"], record, child_ref, exclude)
+                    child_key = None
+
+                id_field = "id" if node_keys[parent_ref] else "Id"
+                node["body"][spec["lookup_field"]] = f"@{{{parent_ref}.{id_field}}}"
+                nodes.append(node)
+                node_keys[child_ref] = (spec["object"], child_key)
+
+    _flush()
+
+    orphans = [
+        [spec["object"], record.get(spec["external_id"]) if spec.get("external_id") else None, "", False,
+         f"Skipped: parent {parent_key} is not in the input"]
+        for parent_key, related in children_by_parent.items()
+        for spec, record in related
+    ]
+    if orphans:
+        print(f"[GRAPH] Skipped {len(orphans)} child records without a parent in the input")
+
+    return graphs, orphans
+
+
+def _post_graph(client: Salesforce, graph_id: str, nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Submit one graph and return its graph response."""
+    body = {"graphs": [{"graphId": graph_id, "compositeRequest": nodes}]}
+    response = get_rate_controller().call(
+        lambda: client.restful("composite/graph", method="POST", json=body),
+        usage=sf_usage(client)
+    )
+    return response["graphs"][0]
+
+
+def upload_graph_to_sf(
+    client: Salesforce,
+    parent_object: str,
+    parents: List[Dict[str, Any]],
+    parent_external_id: str,
+    children: List[Dict[str, Any]],
+    max_graph_nodes: int = MAX_GRAPH_NODES,
+    max_workers: int = 4,
+) -> Dict[str, Dict[Any, str]]:
+    """
+    Loads parent records and their children in one pass via Composite Graph.
+
+    Parents are upserted on <parent_external_id>. Each entry of <children>
+    describes one child object:
+        {
+            "object": "Contact",
+            "records": [...],
+            "reference_field": "account_external_id",  # column holding the parent's external ID
+            "lookup_field": "AccountId",               # lookup set to the parent's new Id
+            "external_id": "vDMC_SugarExternalId__c",  # optional: upsert + ID map key
+        }
+
+    Graphs of up to <max_graph_nodes> nodes are submitted by <max_workers>
+    threads. A graph is all-or-nothing: if one node fails, the whole graph
+    is rolled back and logged as failed. Parents with more children than
+    fit into one graph are upserted once; the graphs with their remaining
+    children run after that graph succeeded and are skipped if it failed.
+
+    Returns ID maps per object: {object_name: {external_id: SalesforceId}}.
+    Writes one row per node to logs/<env>/graph_write_<parent>_<timestamp>.csv;
+    children whose parent is not in <parents> are logged there as failed.
+    """
+    if max_graph_nodes < 2 or max_graph_nodes > MAX_GRAPH_NODES:
+        raise GraphUploadError(f"max_graph_nodes must be between 2 and {MAX_GRAPH_NODES}")
+
+    for spec in children:
+        missing = [k for k in ("object", "records", "reference_field", "lookup_field") if k not in spec]
+        if missing:
+            raise GraphUploadError(f"Child specification is missing keys: {missing}")
+
+    version_path = f"/services/data/v{client.sf_version}"
+    graphs, orphans = _build_graphs(
+        version_path, parent_object, parents, parent_external_id, children, max_graph_nodes
+    )
+
+    log_writer = open_csv_log(
+        base_dir=Path(log_dir),
+        object_name=parent_object,
+        prefix="graph_write",
+        env=env,
+        header=["object", "external_id", "sf_id", "success", "errors"]
+    )
+
+    id_maps: Dict[str, Dict[Any, str]] = {parent_object: {}}
+    for spec in children:
+        id_maps.setdefault(spec["object"], {})
+
+    print(f"[GRAPH] Submitting {len(graphs)} graphs with {max_workers} threads…")
+
+    def _log_failed(graph: Dict[str, Any], error: str):
+        for keys in graph["node_keys"].values():
+            if keys:
+                log_writer.write_row([keys[0], keys[1], "", False, error])
+
+    with log_writer, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        log_writer.write_rows(orphans)
+        waiting = dict(enumerate(graphs))
+        succeeded, failed = set(), set()
+        running = {}
+
+        while waiting or running:
+            # Follow-up graphs start once the graph upserting their parents succeeded
+            for index in list(waiting):
+                depends_on = waiting[index]["depends_on"]
+                if depends_on & failed:
+                    _log_failed(waiting.pop(index), "Skipped: graph upserting the parent failed")
+                    failed.add(index)
+                elif depends_on <= succeeded:
+                    graph = waiting.pop(index)
+                    running[executor.submit(_post_graph, client, f"g{index + 1}", graph["nodes"])] = index
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                graph = graphs[index]
+                node_keys = graph["node_keys"]
+
+                try:
+                    response = future.result()
+                except Exception as e:
+                    _log_failed(graph, f"Exception: {e}")
+                    failed.add(index)
+                    continue
+
+                success = response.get("isSuccessful", False)
+                (succeeded if success else failed).add(index)
+
+                for node in response["graphResponse"]["compositeResponse"]:
+                    keys = node_keys[node["referenceId"]]
+                    if keys is None:
+                        # Parent lookup of a follow-up graph
+                        continue
+                    object_name, key = keys
+                    body = node.get("body")
+
+                    if success:
+                        sf_id = body.get("id") if isinstance(body, dict) else ""
+                        if key is not None:
+                            id_maps[object_name][key] = sf_id
+                        log_writer.write_row([object_name, key, sf_id, True, ""])
+                    else:
+                        errors = ";".join(
+                            f"{e.get('errorCode')}: {e.get('message')}"
+                            for e in (body if isinstance(body, list) else [])
+                        )
+                        log_writer.write_row([object_name, key, "", False, errors])
+
+    print(f"[GRAPH] Upload done for {parent_object}. Log file: {log_writer.file_path}")
+    return id_maps
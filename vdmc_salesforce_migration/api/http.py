@@ -0,0 +1,32 @@
+import requests
+from simple_salesforce import Salesforce
+
+from vdmc_salesforce_migration.api.auth import refresh_session
+from vdmc_salesforce_migration.api.throttle import get_rate_controller
+
+
+def sf_request(client: Salesforce, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a raw request on the client's (pooled) session.
+
+    Requests go through the shared rate controller (throttling retries);
+    an expired session is refreshed once and the request retried.
+    The final response is returned as-is, error statuses included.
+    """
+    extra_headers = kwargs.pop("headers", {})
+    controller = get_rate_controller()
+
+    for attempt in range(2):
+        session_id = client.session_id
+        headers = {"Authorization": f"Bearer {session_id}", **extra_headers}
+
+        response = controller.request(
+            lambda: client.session.request(method, url, headers=headers, **kwargs)
+        )
+
+        if response.status_code == 401 and attempt == 0:
+            refresh_session(client, stale_session_id=session_id)
+            continue
+        break
+
+    return response
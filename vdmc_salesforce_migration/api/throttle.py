@@ -0,0 +1,304 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Optional, Set, Tuple
+
+from vdmc_salesforce_migration.utils.config_loader import get_rate_control_settings, get_async_rate_control_settings
+
+# Status codes Salesforce uses for throttling / temporary overload
+THROTTLE_STATUS_CODES = (429, 503)
+THROTTLE_ERROR_CODES = ("REQUEST_LIMIT_EXCEEDED", "SERVER_UNAVAILABLE")
+
+LIMIT_INFO_REGEX = re.compile(r"api-usage=(\d+)/(\d+)")
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a throttled request still fails after all retries."""
+    pass
+
+
+def parse_limit_info(header: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Sforce-Limit-Info header like "api-usage=25/15000" into (used, total).
+    """
+    if not header:
+        return None
+    match = LIMIT_INFO_REGEX.search(header)
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def is_throttle_response(status_code: int, body: str = "") -> bool:
+    """True if an HTTP response means 'slow down and retry'."""
+    if status_code in THROTTLE_STATUS_CODES:
+        return True
+    return status_code == 403 and "REQUEST_LIMIT_EXCEEDED" in (body or "")
+
+
+def _error_codes(exc: Exception) -> Set[str]:
+    """
+    errorCode values of a Salesforce error body, taken from exc.content
+    (simple_salesforce, Bulk2Error) or the body of exc.response (requests).
+    """
+    content = getattr(exc, "content", None)
+    response = getattr(exc, "response", None)
+    if content is None and response is not None:
+        content = getattr(response, "text", None)
+
+    if isinstance(content, (bytes, str)):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            return set()
+    if isinstance(content, dict):
+        content = [content]
+    if not isinstance(content, list):
+        return set()
+    return {item.get("errorCode") for item in content if isinstance(item, dict)}
+
+
+def is_throttle_error(exc: Exception) -> bool:
+    """
+    True if an exception (simple_salesforce, requests, Bulk2Error) signals
+    throttling: a throttling status or a known errorCode. The message text
+    is not searched, it may contain any number (record Ids, row numbers).
+    """
+    status = getattr(exc, "status", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if status in THROTTLE_STATUS_CODES:
+        return True
+    return any(code in THROTTLE_ERROR_CODES for code in _error_codes(exc))
+
+
+class AdaptiveRateController:
+    """
+    Shared AIMD (additive increase, multiplicative decrease) concurrency controller.
+
+    - slot() blocks until fewer than <limit> requests are in flight
+      (async_slot() is the coroutine counterpart)
+    - every successful call raises the limit by about one per round of requests
+    - a throttled call, or API usage above <usage_threshold> of the org
+      limit (from Sforce-Limit-Info), cuts the limit by <decrease_factor>
+    - throttled calls are retried with jittered exponential backoff
+    """
+
+    def __init__(
+        self,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        initial_concurrency: int = 4,
+        decrease_factor: float = 0.5,
+        usage_threshold: float = 0.9,
+        max_retries: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.usage_threshold = usage_threshold
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.limit = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self.in_flight = 0
+        self.api_usage: Optional[Tuple[int, int]] = None
+
+        self._condition = threading.Condition()
+        self._last_decrease = float("-inf")
+        # Coroutines waiting in async_slot(), woken from any thread via their loop
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    # ------------------------------------------------------------------
+    # Concurrency window
+    # ------------------------------------------------------------------
+    @contextmanager
+    def slot(self):
+        """Hold one in-flight request slot for the duration of the block."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """
+        slot() for coroutines: a full window parks the coroutine on a future
+        of its own event loop, which a released slot or a raised limit
+        resolves (one waiter per free slot), so the loop is never blocked.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    break
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._condition:
+                    try:
+                        self._async_waiters.remove((loop, waiter))
+                    except ValueError:
+                        # Already woken: hand the free slot to the next waiter
+                        self._wake_async_waiters_locked()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+            self._wake_async_waiters_locked()
+
+    def _wake_async_waiters_locked(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_resolve_waiter, waiter)
+            except RuntimeError:
+                # The waiter's loop is already closed
+                continue
+            free -= 1
+
+    def on_success(self, usage: Optional[Tuple[int, int]] = None):
+        """Additive increase, unless the org is close to its API limit."""
+        with self._condition:
+            if usage:
+                self.api_usage = usage
+                used, total = usage
+                if total and used / total >= self.usage_threshold:
+                    self._decrease_locked()
+                    return
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+            self._wake_async_waiters_locked()
+
+    def on_throttle(self):
+        """Multiplicative decrease after a throttling response."""
+        with self._condition:
+            self._decrease_locked()
+
+    def _decrease_locked(self):
+        # Requests already in flight fail together; count them as one signal
+        now = time.monotonic()
+        if now - self._last_decrease < self.base_delay:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    # ------------------------------------------------------------------
+    # Call wrappers
+    # ------------------------------------------------------------------
+    def call(self, func: Callable[[], Any], usage: Callable[[], Optional[Tuple[int, int]]] = None) -> Any:
+        """
+        Run <func> inside a slot and retry it while it raises throttling errors.
+        <usage> optionally returns the (used, total) API usage seen by the call.
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.slot():
+                try:
+                    result = func()
+                except Exception as e:
+                    if not is_throttle_error(e):
+                        raise
+                    error = e
+                else:
+                    self.on_success(usage() if usage else None)
+                    return result
+
+            self.on_throttle()
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_delay(attempt))
+
+        raise RateLimitExceeded(f"Request still throttled after {self.max_retries} retries: {error}")
+
+    def request(self, send: Callable[[], Any]) -> Any:
+        """
+        Like call(), for functions returning a requests.Response:
+        throttling is read from the status code and body, API usage from
+        the Sforce-Limit-Info header. Returns the final response.
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.slot():
+                response = send()
+
+            if not is_throttle_response(response.status_code, response.text):
+                if response.status_code < 300:
+                    self.on_success(parse_limit_info(response.headers.get("Sforce-Limit-Info")))
+                return response
+
+            self.on_throttle()
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_delay(attempt))
+
+        raise RateLimitExceeded(
+            f"Request still throttled after {self.max_retries} retries: "
+            f"{response.status_code} {response.text}"
+        )
+
+
+def _resolve_waiter(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_controller: Optional[AdaptiveRateController] = None
+_async_controller: Optional[AdaptiveRateController] = None
+_controller_lock = threading.Lock()
+
+
+def get_rate_controller() -> AdaptiveRateController:
+    """
+    Return the process-wide controller shared by all REST/Bulk calls,
+    configured from the rate_control section of config.yaml.
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdaptiveRateController(**get_rate_control_settings())
+        return _controller
+
+
+def get_async_rate_controller() -> AdaptiveRateController:
+    """
+    Return the process-wide controller of the async REST engine: rate_control
+    overridden by async_rate_control in config.yaml. Coroutines are cheap, so
+    its ceiling is set independently of the thread pools' max_concurrency.
+    """
+    global _async_controller
+    with _controller_lock:
+        if _async_controller is None:
+            _async_controller = AdaptiveRateController(**get_async_rate_control_settings())
+        return _async_controller
+
+
+def sf_usage(obj) -> Callable[[], Optional[Tuple[int, int]]]:
+    """
+    Usage reader for simple_salesforce objects (Salesforce / SFType),
+    which parse Sforce-Limit-Info into .api_usage after every call.
+    """
+    def _read():
+        usage = getattr(obj, "api_usage", {}).get("api-usage")
+        return (usage.used, usage.total) if usage else None
+    return _read
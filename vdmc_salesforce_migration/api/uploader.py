@@ -3,20 +3,73 @@ from pathlib import Path
 from typing import List, Dict, Any
 from vdmc_salesforce_migration.utils.logging import (
     get_log_file,
-    init_csv_log,
-    append_csv_row
+    open_csv_log,
+    CsvLogWriter
 )
-from vdmc_salesforce_migration.utils.config_loader import get_log_dir, get_default_env, get_default_batch_size
-from vdmc_salesforce_migration.api.auth import get_salesforce_client
-from vdmc_salesforce_migration import query_all_records
-import requests
-import math
-from concurrent.futures import ThreadPoolExecutor
+from vdmc_salesforce_migration.utils.config_loader import get_log_dir, get_default_env, get_bulk_max_job_bytes, get_bulk_max_concurrent_jobs
+from vdmc_salesforce_migration.utils.records import RecordSource, clean_payload, iter_records, iter_csv_payloads
+from vdmc_salesforce_migration.utils.checkpoint import Checkpoint, open_rest_checkpoint
+from vdmc_salesforce_migration.api.auth import get_salesforce_client, configure_shared_client
+from vdmc_salesforce_migration.api import bulk2
+from vdmc_salesforce_migration.api.http import sf_request
+from vdmc_salesforce_migration.api.throttle import get_rate_controller, sf_usage, RateLimitExceeded
+from vdmc_salesforce_migration.utils.soql import iter_record_ids
+import csv
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 root_dir = Path(__file__).resolve().parent.parent.parent
 log_dir = root_dir / get_log_dir()
 env = get_default_env()
-default_batch_size = get_default_batch_size()
+bulk_max_job_bytes = get_bulk_max_job_bytes()
+bulk_max_concurrent_jobs = get_bulk_max_concurrent_jobs()
+
+# sObject Collections accept at most 200 records per request
+COLLECTION_SIZE = 200
+
+
+class UploadError(Exception):
+    """Raised when an upload is called with arguments it cannot honour."""
+    pass
+
+
+def _format_collection_errors(errors: List[Dict[str, Any]]) -> str:
+    """Flatten sObject Collections / invocable action error objects into one log string."""
+    return ";".join(f"{e.get('statusCode')}: {e.get('message')}" for e in errors or [])
+
+
+def _upload_collection(
+    client: Salesforce,
+    object_name: str,
+    batch: List[Dict[str, Any]],
+    external_identifier: str = None,
+    id_field: str = None,
+    all_or_none: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Create or upsert up to 200 records in a single composite/sobjects call.
+    Returns one result per record, in input order.
+    """
+    records = []
+    for record in batch:
+        # Upserts match on the external id field, so it stays in the payload
+        payload = clean_payload(record, [] if id_field == external_identifier else [id_field])
+        payload["attributes"] = {"type": object_name}
+        records.append(payload)
+
+    body = {"allOrNone": all_or_none, "records": records}
+
+    if external_identifier:
+        path, method = f"composite/sobjects/{object_name}/{external_identifier}", "PATCH"
+    else:
+        path, method = "composite/sobjects", "POST"
+
+    return get_rate_controller().call(
+        lambda: client.restful(path, method=method, json=body),
+        usage=sf_usage(client)
+    )
+
 
 # ---------------------------------------------------------------------------
 # REST API upload (single-record operations, slow but precise)
@@ -27,20 +80,105 @@ def upload_to_sf_rest(
     data: List[Dict[str, Any]],
     external_identifier: str = None,
     id_field: str = None,
+    use_collections: bool = False,
+    all_or_none: bool = False,
+    log_writer: CsvLogWriter = None,
+    run_id: str = None,
 ):
     """
     Uploads records using the REST API (simple_salesforce) as some objects are not supported via BULK.
     Writes success/error rows to a per-env log file.
+
+    With use_collections=True, records are sent in batches of 200 through
+    sObject Collections (composite/sobjects) instead of one request per record.
+    Upserts then match on <external_identifier>, which must be present in
+    every record. all_or_none rolls back a whole batch if one record fails.
+
+    Pass a shared <log_writer> to log several calls (e.g. parallel chunks)
+    into one file; otherwise a new id_write log is created and closed here.
+
+    With a <run_id>, successfully written <id_field> values are checkpointed;
+    re-running with the same run_id skips them.
     """
 
-    log_base = Path(log_dir)
-    log_file = get_log_file(
-        base_dir=log_base,
-        object_name=object_name,
-        prefix="id_write",
-        env=env
-    )
-    init_csv_log(log_file, ["external_id", "sf_id", "success", "errors"])
+    checkpoint = None
+    if run_id:
+        checkpoint = open_rest_checkpoint(log_dir, env, run_id, object_name, id_field)
+        data = checkpoint.skip_completed(data, id_field)
+
+    own_log = log_writer is None
+    if own_log:
+        log_writer = open_csv_log(
+            base_dir=Path(log_dir),
+            object_name=object_name,
+            prefix="id_write",
+            env=env,
+            header=["external_id", "sf_id", "success", "errors"],
+            run_id=run_id
+        )
+
+    try:
+        _upload_rest_records(
+            client, object_name, data, external_identifier, id_field,
+            use_collections, all_or_none,
+            checkpoint.wrap_log(log_writer) if checkpoint else log_writer
+        )
+    finally:
+        if own_log:
+            log_writer.close()
+        if checkpoint:
+            checkpoint.close()
+
+    # Callers sharing a log (parallel workers) report progress themselves
+    if own_log:
+        print(f"[REST] Upload done for {object_name}. Log file: {log_writer.file_path}")
+
+
+def _upload_rest_records(
+    client: Salesforce,
+    object_name: str,
+    data: List[Dict[str, Any]],
+    external_identifier: str,
+    id_field: str,
+    use_collections: bool,
+    all_or_none: bool,
+    log_writer: CsvLogWriter,
+):
+    """
+    Record loop of upload_to_sf_rest; writes one log row per record.
+    Calls go through the shared rate controller, which retries throttled
+    requests; only a request that stays throttled is re-raised.
+    """
+    controller = get_rate_controller()
+
+    if use_collections:
+        records = iter(data)
+
+        while True:
+            batch = list(itertools.islice(records, COLLECTION_SIZE))
+            if not batch:
+                break
+
+            external_values = [record.get(id_field, "") if id_field else "" for record in batch]
+
+            try:
+                results = _upload_collection(
+                    client, object_name, batch, external_identifier, id_field, all_or_none
+                )
+            except Exception as e:
+                log_writer.write_rows(
+                    [[external_value, "", False, f"Exception: {e}"] for external_value in external_values]
+                )
+                if isinstance(e, RateLimitExceeded):
+                    raise
+                continue
+
+            log_writer.write_rows([
+                [external_value, result.get("id"), result.get("success"),
+                 _format_collection_errors(result.get("errors"))]
+                for external_value, result in zip(external_values, results)
+            ])
+        return
 
     sf_object = getattr(client, object_name)
 
@@ -49,20 +187,23 @@ def upload_to_sf_rest(
         external_value = record.get(id_field, "") if id_field else ""
 
         # Remove the external id field from payload
-        payload = {k: v for k, v in record.items() if k != id_field and v not in ["", None]}
+        payload = clean_payload(record, [id_field])
 
         try:
             if external_identifier:
-                result = sf_object.upsert(
-                    record_id=external_identifier,
-                    data=payload
+                result = controller.call(
+                    lambda: sf_object.upsert(record_id=external_identifier, data=payload),
+                    usage=sf_usage(sf_object)
                 )
             else:
-                result = sf_object.create(payload)
+                result = controller.call(
+                    lambda: sf_object.create(payload),
+                    usage=sf_usage(sf_object)
+                )
 
         except Exception as e:
-            append_csv_row(log_file, [external_value, "", False, f"Exception: {e}"])
-            if "REQUEST_LIMIT_EXCEEDED" in str(e) or "429" in str(e):
+            log_writer.write_row([external_value, "", False, f"Exception: {e}"])
+            if isinstance(e, RateLimitExceeded):
                 raise
             continue
 
@@ -70,40 +211,102 @@ def upload_to_sf_rest(
         success = result.get("success", True)
         errors = ";".join(result.get("errors", []))
 
-        append_csv_row(log_file, [external_value, sf_id, success, errors])
-
-    print(f"[REST] Upload done for {object_name}. Log file: {log_file}")
+        log_writer.write_row([external_value, sf_id, success, errors])
 
 
 # ---------------------------------------------------------------------------
-# BULK API 2.0 upsert or insert
+# BULK API 2.0 helpers
 # ---------------------------------------------------------------------------
-def upload_to_sf_bulk(
+def _run_bulk_job(
     client: Salesforce,
     object_name: str,
-    data: List[Dict[str, Any]],
+    operation: str,
+    data: RecordSource,
     external_identifier: str = None,
-    batch_size: int = default_batch_size,
-):
+    batch_size: int = None,
+    max_concurrent_jobs: int = None,
+    run_id: str = None,
+) -> List[Dict[str, Any]]:
     """
-    Uploads records using the BULK API 2.0 (simple_salesforce.bulk2).
-    Logs failed rows to error CSVs.
+    Streams <data> into Bulk API 2.0 ingest jobs cut by serialized size
+    (bulk_max_job_bytes) and optionally capped at <batch_size> records per job.
+    Up to <max_concurrent_jobs> jobs (default: bulk_max_concurrent_jobs)
+    are uploaded and processed at the same time.
+    Writes the failed rows of every job to its own error CSV; its path is
+    returned in the job info as "error_file".
+
+    With a <run_id>, job ids are checkpointed per payload. Re-running with
+    the same run_id and input skips completed payloads, re-submits the
+    failed rows of completed jobs, re-attaches to jobs that were still
+    processing and re-submits failed or aborted ones. Different input
+    under the same run_id raises CheckpointError.
     """
+    payloads = iter_csv_payloads(
+        iter_records(data),
+        max_bytes=bulk_max_job_bytes,
+        max_records=batch_size,
+    )
+    checkpoint = Checkpoint(log_dir, env, run_id, f"{object_name}_{operation}") if run_id else None
+
+    try:
+        results = bulk2.run_ingest(
+            client,
+            object_name=object_name,
+            operation=operation,
+            payloads=payloads,
+            external_id_field=external_identifier,
+            max_concurrent_jobs=max_concurrent_jobs or bulk_max_concurrent_jobs,
+            checkpoint=checkpoint,
+        )
+    except bulk2.IngestError as e:
+        # Keep the failed rows of the jobs that did run before re-raising
+        _write_job_errors(client, object_name, e.results)
+        raise
+    finally:
+        if checkpoint:
+            checkpoint.close()
 
-    sf_object = client.bulk2.__getattr__(object_name)
+    _write_job_errors(client, object_name, results)
+    return results
 
-    if external_identifier:
-        results = sf_object.upsert(records=data, external_id_field=external_identifier, batch_size=batch_size)
-    else:
-        results = sf_object.insert(records=data, batch_size=batch_size)
 
-    # Log failures
+def _write_job_errors(client: Salesforce, object_name: str, results: List[Dict[str, Any]]):
+    """Write the failed rows of every job with failures to its own error CSV."""
     log_base = Path(log_dir)
 
     for job in results:
-        job_id = job["job_id"]
-        error_file = get_log_file(log_base, object_name, "errors", env)
-        sf_object.get_failed_records(job_id, file=str(error_file))
+        if job.get("numberRecordsFailed", 0):
+            error_file = get_log_file(log_base, object_name, "errors", env)
+            bulk2.write_failed_results(client, job["id"], error_file)
+            job["error_file"] = error_file
+
+
+# ---------------------------------------------------------------------------
+# BULK API 2.0 upsert or insert
+# ---------------------------------------------------------------------------
+def upload_to_sf_bulk(
+    client: Salesforce,
+    object_name: str,
+    data: RecordSource,
+    external_identifier: str = None,
+    batch_size: int = None,
+    max_concurrent_jobs: int = None,
+    run_id: str = None,
+):
+    """
+    Uploads records using the BULK API 2.0.
+    <data> can be a list/generator of dicts, a DataFrame, an iterator of
+    DataFrame chunks or a CSV path; it is streamed, never fully loaded.
+    Jobs are cut by payload size; <batch_size> optionally caps records per job.
+    <max_concurrent_jobs> jobs run at once (default from config.yaml).
+    Pass a <run_id> to make the upload resumable (see _run_bulk_job).
+    Logs failed rows to error CSVs.
+    """
+
+    operation = "upsert" if external_identifier else "insert"
+    _run_bulk_job(
+        client, object_name, operation, data, external_identifier, batch_size, max_concurrent_jobs, run_id
+    )
 
     print(f"[BULK] Upload done for {object_name}. Errors logged to {log_dir}/{env}/")
 
@@ -114,27 +317,29 @@ def upload_to_sf_bulk(
 def update_to_sf_bulk(
     client: Salesforce,
     object_name: str,
-    data: List[Dict[str, Any]],
+    data: RecordSource,
     external_identifier: str = None,
-    batch_size: int = default_batch_size,
+    batch_size: int = None,
+    max_concurrent_jobs: int = None,
+    run_id: str = None,
 ):
     """
-    Bulk update via Bulk API 2.0.
+    Bulk update via Bulk API 2.0 (streamed like upload_to_sf_bulk).
+    Bulk 2.0 updates match on Id only, so every record needs an Id.
+    <external_identifier> is rejected with UploadError: matching on it
+    would need an upsert job, which inserts records for unknown keys.
+    Resolve the Ids first (get_sf_id_by_external / resolve_references)
+    or call upload_to_sf_bulk to upsert on purpose.
     """
-
-    sf_object = client.bulk2.__getattr__(object_name)
-
     if external_identifier:
-        results = sf_object.update(records=data, external_id_field=external_identifier, batch_size=batch_size)
-    else:
-        results = sf_object.update(records=data, batch_size=batch_size)
-
-    log_base = Path(log_dir)
+        raise UploadError(
+            f"update_to_sf_bulk matches on Id only; resolve the Ids for '{external_identifier}' first "
+            f"or use upload_to_sf_bulk to upsert {object_name}"
+        )
 
-    for job in results:
-        job_id = job["job_id"]
-        error_file = get_log_file(log_base, object_name, "errors", env)
-        sf_object.get_failed_records(job_id, file=str(error_file))
+    _run_bulk_job(
+        client, object_name, "update", data, None, batch_size, max_concurrent_jobs, run_id
+    )
 
     print(f"[BULK] Update done for {object_name}. Errors logged to {log_dir}/{env}/")
 
@@ -151,82 +356,168 @@ def _get_salesforce_base_url(client) -> str:
     return client.base_url.split("/services")[0]
 
 
+# Orders sent per createOrUpdateAssetFromOrder invocation
+ACTIVATION_BATCH_SIZE = 50
+
+
+def _activate_order_batch(client, endpoint: str, batch: list) -> list:
+    """
+    Invoke createOrUpdateAssetFromOrder for a batch of OrderIds.
+    Returns error rows [order_id, errors] for the orders that failed.
+    """
+    payload = {"inputs": [{"orderId": order_id} for order_id in batch]}
+
+    try:
+        response = sf_request(
+            client, "POST", endpoint, json=payload, headers={"Content-Type": "application/json"}
+        )
+    except Exception as e:
+        return [[order_id, f"Exception: {e}"] for order_id in batch]
+
+    # Invocable actions answer with one result per input, in input order,
+    # also with a 4xx status when some or all inputs failed
+    try:
+        results = response.json()
+    except ValueError:
+        results = None
+    if not isinstance(results, list):
+        return [[order_id, f"HTTP {response.status_code}: {response.text}"] for order_id in batch]
+
+    error_rows = [
+        [order_id, _format_collection_errors(result.get("errors"))]
+        for order_id, result in zip(batch, results)
+        if not result.get("isSuccess")
+    ]
+
+    if len(results) != len(batch):
+        print(
+            f"[Asset Activation] {len(results)} results for {len(batch)} orders "
+            f"(HTTP {response.status_code}); unmatched orders logged as failed"
+        )
+        error_rows.extend(
+            [order_id, f"No result returned for this order (HTTP {response.status_code})"]
+            for order_id in batch[len(results):]
+        )
+
+    return error_rows
+
+
 def activate_assets_via_api(
     client,
-    order_ids: list
+    order_ids: list,
+    batch_size: int = ACTIVATION_BATCH_SIZE,
+    max_workers: int = None
 ):
     """
     Triggers Salesforce standard action createOrUpdateAssetFromOrder
     for a list of OrderIds.
 
-    Logs failures to logs/<env>/order_to_asset_<timestamp>.csv.
+    Sends <batch_size> orders per invocation and runs the batches on
+    <max_workers> threads (default: rate controller max_concurrency)
+    over the client's pooled session, using the client's API version.
+
+    Logs failures (per order) to logs/<env>/errors_order_to_asset_<timestamp>.csv.
     """
 
+    if max_workers is None:
+        max_workers = get_rate_controller().max_concurrency
+
     # -------------------------------------------------------------
     # Use existing authenticated client session (NO second login!)
-    # -------------------------------------------------------------
-    session_id = client.session_id
-
     # client.base_url is always correct (sandbox / prod / hyperforce)
-    base_url = client.base_url.split("/services")[0]
-    endpoint = f"{base_url}/services/data/v65.0/actions/standard/createOrUpdateAssetFromOrder"
-
-    headers = {
-        "Authorization": f"Bearer {session_id}",
-        "Content-Type": "application/json"
-    }
+    # and carries the configured API version
+    # -------------------------------------------------------------
+    configure_shared_client(client, pool_size=max_workers)
+    endpoint = f"{client.base_url}actions/standard/createOrUpdateAssetFromOrder"
 
     # -------------------------------------------------------------
     # Logging
     # -------------------------------------------------------------
-    log_file = get_log_file(
+    log_writer = open_csv_log(
         base_dir=Path(log_dir),
         object_name="order_to_asset",
         prefix="errors",
-        env=env
+        env=env,
+        header=["order_id", "errors"]
     )
-    init_csv_log(log_file, ["order_id", "errors"])
 
+    batches = list(iter_work_units(order_ids, batch_size))
     total = len(order_ids)
+    done = failed = 0
+
+    print(f"[Asset Activation] {total} orders in {len(batches)} batches, {max_workers} threads")
 
     # -------------------------------------------------------------
-    # Loop over orders
+    # Run batches concurrently
     # -------------------------------------------------------------
-    for idx, order_id in enumerate(order_ids, start=1):
-        print(f"{idx}/{total} ({idx / total:.1%}) – Order {order_id}")
+    with log_writer, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_activate_order_batch, client, endpoint, batch): batch
+            for batch in batches
+        }
+
+        for future in as_completed(futures):
+            error_rows = future.result()
+            log_writer.write_rows(error_rows)
 
-        payload = { "inputs": [ { "orderId": order_id } ] }
+            done += len(futures[future])
+            failed += len(error_rows)
+            print(f"{done}/{total} ({done / total:.1%}) orders processed, {failed} failed")
 
-        response = requests.post(endpoint, headers=headers, json=payload)
+    print(f"[Asset Activation] Complete. Errors logged to {log_writer.file_path}")
 
-        # Error logging
-        if response.status_code >= 300:
-            append_csv_row(log_file, [order_id, response.text])
 
-    print(f"[Asset Activation] Complete. Errors logged to {log_file}")
+# Records per work unit pulled by a parallel REST worker
+DEFAULT_WORK_UNIT_SIZE = 50
 
 
-def chunk_data(data, num_chunks):
+def iter_work_units(data, unit_size):
     """
-    Split data evenly into <num_chunks> chunks.
+    Lazily cut <data> (list or any iterable) into small work units of <unit_size> records.
     """
-    size = math.ceil(len(data) / num_chunks)
-    return [data[i:i+size] for i in range(0, len(data), size)]
+    records = iter(data)
+    while True:
+        unit = list(itertools.islice(records, unit_size))
+        if not unit:
+            return
+        yield unit
 
-def upload_rest_chunk(env, chunk, object_name, external_id, id_field):
+
+def upload_rest_worker(worker_id, next_unit, client, object_name, external_id, id_field,
+                       use_collections=False, log_writer=None, progress_every=10):
     """
     Worker function run in a thread.
-    Creates its own Salesforce client and uploads a chunk.
+    Pulls work units from the shared queue until it is empty and uploads
+    them with the shared client into the shared log. Reports progress
+    every <progress_every> units. Returns (units, records) processed.
     """
-    client = get_salesforce_client(env)
-    upload_to_sf_rest(
-        client=client,
-        object_name=object_name,
-        data=chunk,
-        external_identifier=external_id,
-        id_field=id_field,
-        env=env
-    )
+    units = records = 0
+
+    while True:
+        unit = next_unit()
+        if unit is None:
+            break
+
+        try:
+            upload_to_sf_rest(
+                client=client,
+                object_name=object_name,
+                data=unit,
+                external_identifier=external_id,
+                id_field=id_field,
+                use_collections=use_collections,
+                log_writer=log_writer
+            )
+        except Exception as e:
+            print(f"❌ Worker {worker_id}: error in work unit: {e}")
+
+        units += 1
+        records += len(unit)
+        if units % progress_every == 0:
+            print(f"▶ Worker {worker_id}: {units} units / {records} records done")
+
+    print(f"✔ Worker {worker_id} finished: {units} units / {records} records")
+    return units, records
 
 
 def upload_rest_parallel(
@@ -234,41 +525,95 @@ def upload_rest_parallel(
     data: list,
     external_identifier: str = None,
     id_field: str = None,
-    num_threads: int = 4,
-    env: str = None
+    num_threads: int = None,
+    env: str = None,
+    use_collections: bool = False,
+    client: Salesforce = None,
+    unit_size: int = None,
+    run_id: str = None
 ):
     """
     Parallel REST upload using multiple threads.
+    use_collections=True sends 200 records per request (see upload_to_sf_rest).
+
+    Workers pull small work units (<unit_size> records, default 50, or 200
+    with collections) from one shared queue instead of getting a fixed
+    slice each, so a slow unit never leaves the other threads idle.
+    <data> may be a list or any iterable; it is consumed lazily.
+
+    All threads share one authenticated client (logged in once, or <client>
+    if given) whose connection pool is sized to <num_threads>.
+    <num_threads> defaults to the rate controller's max_concurrency; the
+    controller then adapts how many requests are actually in flight.
+
+    With a <run_id>, completed <id_field> values are checkpointed and
+    skipped when the run is restarted.
     """
     if env is None:
         env = get_default_env()
 
-    chunks = chunk_data(data, num_threads)
+    if num_threads is None:
+        num_threads = get_rate_controller().max_concurrency
 
-    print(f"▶ Starting parallel REST upload with {num_threads} threads…")
-    print(f"▶ Total records: {len(data)} | Chunks: {len(chunks)}")
+    checkpoint = None
+    if run_id:
+        checkpoint = open_rest_checkpoint(log_dir, env, run_id, object_name, id_field)
+        data = checkpoint.skip_completed(data, id_field)
 
-    with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        futures = [
-            executor.submit(
-                upload_rest_chunk,
-                env,
-                chunk,
-                object_name,
-                external_identifier,
-                id_field
-            )
-            for chunk in chunks
-        ]
+    try:
+        if unit_size is None:
+            unit_size = COLLECTION_SIZE if use_collections else DEFAULT_WORK_UNIT_SIZE
 
-        for i, future in enumerate(futures, start=1):
-            try:
-                future.result()
-                print(f"✔ Chunk {i}/{num_threads} done")
-            except Exception as e:
-                print(f"❌ Error in chunk {i}: {e}")
+        if client is None:
+            client = get_salesforce_client()
+        configure_shared_client(client, pool_size=num_threads)
+
+        # Shared work queue: workers take the next unit when they are free
+        units = iter_work_units(data, unit_size)
+        queue_lock = threading.Lock()
 
-    print("✔ Parallel REST upload complete.")
+        def next_unit():
+            with queue_lock:
+                return next(units, None)
+
+        total = f"{len(data)}" if hasattr(data, "__len__") else "streamed"
+        print(f"▶ Starting parallel REST upload with {num_threads} threads…")
+        print(f"▶ Total records: {total} | Work unit size: {unit_size}")
+
+        # One buffered log for all threads instead of one file per chunk
+        log_writer = open_csv_log(
+            base_dir=Path(log_dir),
+            object_name=object_name,
+            prefix="id_write",
+            env=env,
+            header=["external_id", "sf_id", "success", "errors"],
+            run_id=run_id
+        )
+        worker_log = checkpoint.wrap_log(log_writer) if checkpoint else log_writer
+
+        with log_writer, ThreadPoolExecutor(max_workers=num_threads) as executor:
+            futures = [
+                executor.submit(
+                    upload_rest_worker,
+                    worker_id,
+                    next_unit,
+                    client,
+                    object_name,
+                    external_identifier,
+                    id_field,
+                    use_collections,
+                    worker_log
+                )
+                for worker_id in range(1, num_threads + 1)
+            ]
+
+            processed = sum(future.result()[1] for future in futures)
+    finally:
+        # Also closed when a worker fails, so completed IDs stay on disk
+        if checkpoint:
+            checkpoint.close()
+
+    print(f"✔ Parallel REST upload complete ({processed} records). Log file: {log_writer.file_path}")
 
 
 def deactivate_records(client, object_name, data):
@@ -284,88 +629,138 @@ def deactivate_records(client, object_name, data):
     update_to_sf_bulk(client, object_name, data, external_identifier=None)
 
 
+# Delete errors worth retrying in smaller jobs; anything else is final
+RETRYABLE_DELETE_ERRORS = (
+    "DELETE_OPERATION_TOO_LARGE",
+    "UNABLE_TO_LOCK_ROW",
+    "CANNOT_INSERT_UPDATE_ACTIVATE_ENTITY",
+)
+
+
+def _delete_error_code(error: str) -> str:
+    """Extract the status code from a Bulk sf__Error value like 'UNABLE_TO_LOCK_ROW:unable to …:--'."""
+    return (error or "").split(":", 1)[0].strip()
+
+
 def cleanup_sobject(
     client: Salesforce,
     object_name: str,
-):
+    initial_batch_size: int = 10000,
+    max_rounds: int = 20,
+) -> int:
     """
     Full cleanup flow for an sObject:
-      1. Query all records
+      1. Stream all Ids from a Bulk API 2.0 query job
       2. Deactivate (Order only)
-      3. Bulk delete with decreasing batch sizes:
-         10k → 100 → 10 → 1
-      4. Log progress consistently
+      3. Bulk delete everything in jobs of <initial_batch_size> records
+      4. Retry only the failed Ids, read from each job's failed results:
+         - DELETE_OPERATION_TOO_LARGE / lock errors are bisected: every
+           round halves the job size over the remaining failures (down to 1)
+         - other errors are final and are not retried
+      5. Log progress consistently
+
+    Returns the number of records that could not be deleted (0 when the
+    object is empty afterwards).
     """
 
     print(f"\n=== CLEANUP: {object_name} ===")
 
-    # Query
-    records = query_all_records(client, object_name)
-    if not records:
+    # Query (Ids are streamed straight into the delete jobs)
+    records = iter_record_ids(client, object_name)
+    first = next(records, None)
+    if first is None:
         print(f"[CLEANUP] No records found for {object_name}")
-        return
+        return 0
+    records = itertools.chain([first], records)
 
     # Deactivate Orders
     if object_name.lower() == "order":
         print("[CLEANUP] Deactivating Orders before deletion…")
+        records = list(records)
         deactivate_records(client, object_name, records)
 
-    # 3) Delete with batch sizes
-    batch_sizes = [10000, 100, 10, 1]
+    # 3) First pass over everything
+    failed = delete_from_sf_bulk(
+        client=client,
+        object_name=object_name,
+        data=records,
+        batch_size=initial_batch_size
+    )
+
+    # 4) Retry only retryable failures, bisecting the job size
+    batch_size = initial_batch_size
+    final_failures = 0
 
-    remaining = {"records": records}  # initial placeholder
+    for _ in range(max_rounds):
+        retry_ids = []
+        for row in failed:
+            if _delete_error_code(row.get("sf__Error")) in RETRYABLE_DELETE_ERRORS:
+                retry_ids.append(row.get("Id") or row.get("sf__Id"))
+            else:
+                final_failures += 1
 
-    for bs in batch_sizes:
-        if not remaining["records"]:
+        if not retry_ids or batch_size == 1:
+            final_failures += len(retry_ids)
             break
 
-        remaining = delete_from_sf_bulk(
+        batch_size = max(1, min(batch_size, len(retry_ids)) // 2)
+        print(f"[CLEANUP] Retrying {len(retry_ids)} records in jobs of {batch_size}")
+
+        # Small jobs run one at a time to avoid lock contention on shared parents
+        failed = delete_from_sf_bulk(
             client=client,
             object_name=object_name,
-            data=records,
-            batch_size=bs
+            data=[{"Id": record_id} for record_id in retry_ids],
+            batch_size=batch_size,
+            max_concurrent_jobs=1
         )
+    else:
+        final_failures += len(failed)
 
-    print(f"[CLEANUP] Finished cleanup for {object_name}")
+    print(
+        f"[CLEANUP] Finished cleanup for {object_name}. "
+        f"{final_failures} records could not be deleted (see error logs in {log_dir}/{env}/)"
+    )
+    return final_failures
 
 
 def delete_from_sf_bulk(
     client: Salesforce,
     object_name: str,
-    data: List[Dict[str, Any]],
-    batch_size: int = default_batch_size,
-):
+    data: RecordSource,
+    batch_size: int = None,
+    max_concurrent_jobs: int = None,
+    run_id: str = None,
+) -> List[Dict[str, str]]:
     """
-    Bulk delete via Bulk API 2.0.
+    Bulk delete via Bulk API 2.0 (streamed like upload_to_sf_bulk).
 
     Writes failed rows into a CSV file in logs/<env>/errors_<object>_<timestamp>.csv
+    and returns them (columns sf__Id, sf__Error, Id), so callers can retry
+    exactly what failed without re-querying the object.
     """
 
     print(f"[BULK-DELETE] Starting delete for {object_name} (batch_size={batch_size})")
 
-    sf_object = client.bulk2.__getattr__(object_name)
-    results = sf_object.delete(records=data, batch_size=batch_size)
-
-    # Log failures
-    log_base = Path(log_dir)
-    error_file = get_log_file(
-        base_dir=log_base,
-        object_name=object_name,
-        prefix="errors",
-        env=env
+    results = _run_bulk_job(
+        client,
+        object_name,
+        "delete",
+        data,
+        batch_size=batch_size,
+        max_concurrent_jobs=max_concurrent_jobs,
+        run_id=run_id,
     )
 
+    failed = []
     for job in results:
-        job_id = job["job_id"]
-        sf_object.get_failed_records(job_id, file=str(error_file))
-
-    # Re-query
-    remaining = client.query_all(f"SELECT Id FROM {object_name}")
-    count_remaining = len(remaining["records"])
+        if "error_file" in job:
+            with open(job["error_file"], "r", newline="", encoding="utf-8") as f:
+                failed.extend(csv.DictReader(f))
 
     print(
         f"[BULK-DELETE] Done for {object_name}. "
-        f"{count_remaining} records remain. Errors logged to: {error_file}"
+        f"{len(failed)} records failed. Errors logged to: {log_dir}/{env}/"
     )
 
-    return remaining
+    return failed
@@ -0,0 +1,209 @@
+import hashlib
+import itertools
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from vdmc_salesforce_migration.utils.logging import ensure_directory
+
+
+class CheckpointError(Exception):
+    """
+    Raised when a resumable upload is configured incorrectly, or when a
+    run_id is reused for an upload whose input differs from the checkpoint.
+    """
+    pass
+
+
+def open_rest_checkpoint(base_dir: Path, env: str, run_id: str, object_name: str, id_field: str) -> "Checkpoint":
+    """
+    Checkpoint for a REST upload; records are identified by <id_field>.
+    """
+    if not id_field:
+        raise CheckpointError("Resumable REST uploads (run_id) require id_field to identify records")
+    return Checkpoint(base_dir, env, run_id, f"{object_name}_rest")
+
+
+class Checkpoint:
+    """
+    Run-scoped progress store for resumable uploads.
+
+    Stored under logs/<env>/checkpoints/<run_id>/<scope>/, where the scope
+    (e.g. "Account_upsert") separates the uploads of one run:
+      completed_ids.txt – external IDs written successfully (append-only, one per line)
+      fields.txt        – columns of the REST records the ids belong to
+      jobs.json         – Bulk 2.0 payload index -> {"job_id", "state", "payload" (SHA-256), …}
+
+    Re-running an upload with the same run_id skips completed records and
+    re-attaches to Bulk jobs that were still processing. A second upload
+    with different input (e.g. a ParentId pass over the same object) does
+    not match the stored columns / payload hashes and raises CheckpointError
+    instead of being skipped; give it its own run_id.
+    """
+
+    def __init__(self, base_dir: Path, env: str, run_id: str, scope: str):
+        self.run_id = run_id
+        self.directory = Path(base_dir) / env / "checkpoints" / run_id / scope
+        ensure_directory(self.directory)
+
+        self._ids_path = self.directory / "completed_ids.txt"
+        self._fields_path = self.directory / "fields.txt"
+        self._jobs_path = self.directory / "jobs.json"
+        self._lock = threading.Lock()
+
+        self._completed = set()
+        if self._ids_path.exists():
+            with open(self._ids_path, "r", encoding="utf-8") as f:
+                self._completed = {line.rstrip("\n") for line in f if line.strip()}
+
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._payloads: Dict[str, str] = {}
+        if self._jobs_path.exists():
+            with open(self._jobs_path, "r", encoding="utf-8") as f:
+                self._jobs = json.load(f)
+
+        # Opened on the first completed id, so a rejected checkpoint holds no file
+        self._ids_file = None
+
+    # ------------------------------------------------------------------
+    # Record-level progress (REST)
+    # ------------------------------------------------------------------
+    def is_completed(self, external_id: Any) -> bool:
+        return str(external_id) in self._completed
+
+    def mark_completed(self, external_ids: Iterable[Any]):
+        """Persist successfully written external IDs."""
+        new_ids = [str(i) for i in external_ids if i not in ("", None)]
+        if not new_ids:
+            return
+        with self._lock:
+            self._completed.update(new_ids)
+            if self._ids_file is None:
+                self._ids_file = open(self._ids_path, "a", encoding="utf-8")
+            self._ids_file.write("".join(f"{i}\n" for i in new_ids))
+            self._ids_file.flush()
+
+    def bind_fields(self, fields: Iterable[str]):
+        """
+        Tie the completed ids to the columns of the records they came from;
+        raise CheckpointError when the run_id is reused with other columns.
+        """
+        signature = ",".join(sorted(fields))
+        with self._lock:
+            if self._fields_path.exists():
+                stored = self._fields_path.read_text(encoding="utf-8")
+                if stored != signature:
+                    raise CheckpointError(
+                        f"Checkpoint {self.directory} belongs to an upload with columns [{stored}], "
+                        f"not [{signature}]; use a new run_id for this upload"
+                    )
+                return
+            self._fields_path.write_text(signature, encoding="utf-8")
+
+    def skip_completed(self, data: Iterable[Dict[str, Any]], id_field: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield only the records whose <id_field> value is not completed yet.
+        The columns of the first record are checked against the checkpoint
+        right away (see bind_fields), before any record is consumed.
+        """
+        records = iter(data)
+        first = next(records, None)
+        if first is None:
+            return iter(())
+        self.bind_fields(first)
+        return self._skip_completed(itertools.chain([first], records), id_field)
+
+    def _skip_completed(self, records: Iterator[Dict[str, Any]], id_field: str) -> Iterator[Dict[str, Any]]:
+        skipped = 0
+        for record in records:
+            if self.is_completed(record.get(id_field, "")):
+                skipped += 1
+                continue
+            yield record
+        if skipped:
+            print(f"[CHECKPOINT] {self.run_id}: skipped {skipped} already completed records")
+
+    def wrap_log(self, log_writer) -> "CheckpointLogWriter":
+        """Wrap an id_write log writer so successful rows are checkpointed too."""
+        return CheckpointLogWriter(log_writer, self)
+
+    # ------------------------------------------------------------------
+    # Job-level progress (Bulk 2.0)
+    # ------------------------------------------------------------------
+    def get_job(self, index: int) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(str(index))
+
+    def bind_payload(self, index: int, payload: bytes):
+        """
+        Tie payload <index> to its content (SHA-256, stored with the next
+        record_job); raise CheckpointError if a re-run brings different data.
+        """
+        digest = hashlib.sha256(payload).hexdigest()
+        with self._lock:
+            stored = self._jobs.get(str(index), {}).get("payload")
+            if stored and stored != digest:
+                raise CheckpointError(
+                    f"Payload {index} differs from the one checkpointed in {self.directory}; "
+                    f"use a new run_id for a different upload (same input and batch size to resume)"
+                )
+            self._payloads[str(index)] = digest
+
+    def record_job(self, index: int, job_id: str, state: str, **details: Any):
+        """
+        Persist the job id and state of payload <index> (atomic rewrite).
+        <details> (e.g. records_failed) are stored with them.
+        """
+        with self._lock:
+            entry = {"job_id": job_id, "state": state, **details}
+            payload = self._payloads.get(str(index)) or self._jobs.get(str(index), {}).get("payload")
+            if payload:
+                entry["payload"] = payload
+            self._jobs[str(index)] = entry
+            tmp_path = self._jobs_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._jobs, f)
+            os.replace(tmp_path, self._jobs_path)
+
+    def close(self):
+        with self._lock:
+            if self._ids_file:
+                self._ids_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CheckpointLogWriter:
+    """
+    Log writer proxy: forwards rows (external_id, sf_id, success, errors)
+    to the wrapped writer and checkpoints the successful external IDs.
+    """
+
+    def __init__(self, log_writer, checkpoint: Checkpoint):
+        self._log_writer = log_writer
+        self._checkpoint = checkpoint
+        self.file_path = log_writer.file_path
+
+    def write_row(self, row: list):
+        self.write_rows([row])
+
+    def write_rows(self, rows: list):
+        self._log_writer.write_rows(rows)
+        self._checkpoint.mark_completed(row[0] for row in rows if row[2] is True)
+
+    def flush(self):
+        self._log_writer.flush()
+
+    def close(self):
+        self._log_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,23 +1,86 @@
+import numpy as np
 import pandas as pd
 import re
-from typing import List, Dict, Any
+from itertools import chain
+from typing import Any, Callable, Dict, List, Union
+
+from vdmc_salesforce_migration.utils.distinct import apply_to_distinct
+from vdmc_salesforce_migration.utils.idmap import IdMap
 
 
 # ---------------------------------------------------------------------------
 # Datetime Handling
 # ---------------------------------------------------------------------------
-def convert_datetime(df: pd.DataFrame, fieldname: str) -> pd.DataFrame:
+# Formats tried by format="auto", most common export formats first
+DATETIME_SNIFF_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+    "%d.%m.%Y",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+]
+DATETIME_SNIFF_SAMPLE = 200
+
+
+def sniff_datetime_format(values: pd.Series) -> Union[str, None]:
     """
-    Converts a datetime column into Salesforce-compatible UTC ISO format.
+    Return the first of DATETIME_SNIFF_FORMATS that parses a sample of the
+    non-empty values completely, or None if none fits (inference is used).
     """
-    df[fieldname] = pd.to_datetime(df[fieldname], errors='coerce')
+    sample = values.dropna()
+    sample = sample[sample.astype(str).str.strip() != ""].head(DATETIME_SNIFF_SAMPLE)
+    if sample.empty:
+        return None
+
+    for fmt in DATETIME_SNIFF_FORMATS:
+        if pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            return fmt
+    return None
+
+
+def _datetime_series(series: pd.Series, format: str = None) -> pd.Series:
+    """Series -> Salesforce UTC ISO strings ('' for invalid values)."""
+    series = pd.to_datetime(series, errors='coerce', format=format)
 
-    if df[fieldname].dt.tz is None:
-        df[fieldname] = df[fieldname].dt.tz_localize('UTC')
+    if series.dt.tz is None:
+        series = series.dt.tz_localize('UTC')
     else:
-        df[fieldname] = df[fieldname].dt.tz_convert('UTC')
+        series = series.dt.tz_convert('UTC')
+
+    return series.dt.strftime('%Y-%m-%dT%H:%M:%SZ').fillna('')
+
+
+def convert_datetime(
+    df: pd.DataFrame,
+    fieldname: Union[str, List[str]],
+    format: str = None
+) -> pd.DataFrame:
+    """
+    Converts one or more datetime columns into Salesforce-compatible UTC ISO format.
+
+    format: None infers the format from the first value (as pandas does),
+    "auto" sniffs it from a sample (see DATETIME_SNIFF_FORMATS), anything
+    else is passed to pd.to_datetime. The format is pinned for the whole
+    column, and values that do not match become ''.
+
+    Only the distinct values of a column are parsed and formatted; the
+    results are broadcast back to the rows.
+    """
+    fieldnames = [fieldname] if isinstance(fieldname, str) else fieldname
+
+    def _convert(values: pd.Series) -> pd.Series:
+        return _datetime_series(values, sniff_datetime_format(values) if format == "auto" else format)
+
+    for field in fieldnames:
+        df[field] = apply_to_distinct(df[field], _convert, "")
 
-    df[fieldname] = df[fieldname].dt.strftime('%Y-%m-%dT%H:%M:%SZ').fillna('')
     return df
 
 
@@ -41,15 +104,17 @@ def extract_email_from_field(df: pd.DataFrame, field: str) -> pd.DataFrame:
     return df
 
 
-def clean_emails(df: pd.DataFrame, field_name: str) -> pd.DataFrame:
-    """Ensure field contains valid single emails only."""
-    email_pattern = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+VALID_EMAIL_REGEX = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
 
-    def _validate_email(x):
-        if isinstance(x, str) and email_pattern.match(x):
-            return x.replace("..", ".")
-        return ""
 
+def _validate_email(x):
+    if isinstance(x, str) and VALID_EMAIL_REGEX.match(x):
+        return x.replace("..", ".")
+    return ""
+
+
+def clean_emails(df: pd.DataFrame, field_name: str) -> pd.DataFrame:
+    """Ensure field contains valid single emails only."""
     df[field_name] = df[field_name].apply(_validate_email)
     return df
 
@@ -78,6 +143,7 @@ def clean_numeric_fields(df: pd.DataFrame) -> pd.DataFrame:
 def join_related_fields(row: Dict[str, Any], fields: List[str], lookup: Dict[str, str]) -> str:
     """
     Joins multiple fields into one string.
+    For a whole DataFrame use join_related_columns.
     """
     values = []
     for f in fields:
@@ -91,7 +157,10 @@ def join_related_fields(row: Dict[str, Any], fields: List[str], lookup: Dict[str
 
 
 def replace_ids_in_list(value: Any, id_map: Dict[str, str]) -> str:
-    """Replace semicolon-separated values using a lookup map."""
+    """
+    Replace semicolon-separated values using a lookup map.
+    For a whole column use replace_ids_series.
+    """
     if pd.isna(value) or value == "":
         return ""
 
@@ -100,9 +169,142 @@ def replace_ids_in_list(value: Any, id_map: Dict[str, str]) -> str:
     return ",".join([m for m in mapped if m])
 
 
+def _lookup_values(values: pd.Series, lookup: Union[Dict[str, str], IdMap]) -> pd.Series:
+    """Hash join of a Series against a dict or IdMap; values without an entry become NaN."""
+    if isinstance(lookup, IdMap):
+        return lookup.lookup(values)
+    return values.map(lookup)
+
+
+def _join_by_position(positions: np.ndarray, values: np.ndarray, length: int) -> np.ndarray:
+    """
+    ",".join the <values> of each position 0..length-1, keeping their
+    order; positions without values get "".
+    """
+    joined = np.full(length, "", dtype=object)
+    if not len(values):
+        return joined
+
+    # Stable sort groups each position's values into one run, in input order
+    order = np.argsort(positions, kind="stable")
+    positions = positions[order]
+    items = values[order].tolist()
+
+    starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+    ends = np.r_[starts[1:], len(items)]
+    groups = [",".join(items[start:end]) for start, end in zip(starts.tolist(), ends.tolist())]
+    joined[positions[starts]] = np.array(groups, dtype=object)
+    return joined
+
+
+def replace_ids_series(series: pd.Series, id_map: Union[Dict[str, str], IdMap]) -> pd.Series:
+    """
+    Columnar replace_ids_in_list with identical output.
+
+    The distinct lists are split on ";" and exploded to one ID per entry,
+    mapped through <id_map> in a single join and joined back per list,
+    instead of a Python call with its own lookups per cell.
+    """
+    return apply_to_distinct(series, lambda values: _replace_id_lists(values, id_map), "")
+
+
+def _replace_id_lists(values: pd.Series, id_map: Union[Dict[str, str], IdMap]) -> np.ndarray:
+    count = len(values)
+    values = values[values != ""]
+
+    lists = [str(value).split(";") for value in values]
+    lengths = np.fromiter(map(len, lists), dtype=np.intp, count=len(lists))
+    ids = pd.Series([i.strip() for i in chain.from_iterable(lists)], dtype=object)
+
+    mapped = _lookup_values(ids, id_map).to_numpy(dtype=object)
+    keep = pd.notna(mapped) & (mapped != "")
+    positions = np.repeat(values.index.to_numpy(), lengths)
+
+    return _join_by_position(positions[keep], mapped[keep], count)
+
+
+def join_related_columns(df: pd.DataFrame, fields: List[str], lookup: Union[Dict[str, str], IdMap]) -> pd.Series:
+    """
+    DataFrame-level join_related_fields with identical output: for every
+    row, the lookup values of <fields> (in field order, missing or unknown
+    values skipped) joined with ",".
+
+    The fields are stacked into one column of distinct keys, mapped in a
+    single join and joined back per row.
+    """
+    positions, keys = [], []
+    for field in fields:
+        if field not in df.columns:
+            continue
+        stripped = apply_to_distinct(df[field], lambda values: values.astype(str).str.strip(), None)
+        stripped = stripped.to_numpy(dtype=object)
+        present = pd.notna(stripped)
+        positions.append(np.flatnonzero(present))
+        keys.append(stripped[present])
+
+    joined = np.full(len(df), "", dtype=object)
+    if positions:
+        positions = np.concatenate(positions)
+        mapped = _lookup_values(pd.Series(np.concatenate(keys), dtype=object), lookup).to_numpy(dtype=object)
+        found = pd.notna(mapped)
+        joined = _join_by_position(positions[found], mapped[found], len(df))
+
+    return pd.Series(joined, index=df.index)
+
+
 # ---------------------------------------------------------------------------
 # String Cleaning
 # ---------------------------------------------------------------------------
+# Characters kept by sanitize_field: printable ASCII plus a few German/unit signs
+SANITIZE_ALLOWED = {chr(c) for c in range(0x20, 0x7F)} | set("äöüÄÖÜß€°²³")
+MULTI_SPACE_REGEX = re.compile(r" {2,}")
+
+# Values treated as empty by clear_fields
+EMPTY_VALUES = ["nan", "NaN", "None", "NONE", "null", "NULL"]
+
+
+class _SanitizeTable(dict):
+    """
+    str.translate table doing sanitize_field's character rules in one pass:
+    '"' -> "'", CR/LF/TAB -> ' ', ';' -> '·', other characters outside
+    SANITIZE_ALLOWED are dropped (looked up once, then cached).
+    """
+
+    def __init__(self):
+        super().__init__({ord(c): c for c in SANITIZE_ALLOWED})
+        self.update({ord('"'): "'", ord("\r"): " ", ord("\n"): " ", ord("\t"): " ", ord(";"): "·"})
+
+    def __missing__(self, code):
+        self[code] = None
+        return None
+
+
+SANITIZE_TABLE = _SanitizeTable()
+
+
+def _sanitize_text(value: str) -> str:
+    """
+    sanitize_field for a str. Runs of CR/LF/TAB become several spaces here
+    instead of one, which the space collapsing makes identical.
+    """
+    value = value.translate(SANITIZE_TABLE)
+    if "  " in value:
+        value = MULTI_SPACE_REGEX.sub(" ", value)
+    return value.strip()
+
+
+def sanitize_series(series: pd.Series) -> pd.Series:
+    """
+    Columnar sanitize_field with identical output.
+
+    Each distinct value is cleaned once (pd.factorize) with a single
+    translate table and one regex, instead of a Python call per cell.
+    """
+    return apply_to_distinct(
+        series, lambda values: [_sanitize_text(v) if isinstance(v, str) else sanitize_field(v) for v in values], ""
+    )
+
+
 def sanitize_field(value: Any) -> str:
     """Remove invalid characters, normalize spacing, and strip."""
     if pd.isna(value):
@@ -126,13 +328,15 @@ def clear_fields(df: pd.DataFrame) -> pd.DataFrame:
     """
     Apply sanitization to all object fields and clean numerics.
     """
-    object_cols = df.select_dtypes(include="object").columns
+    object_cols = set(df.select_dtypes(include="object").columns)
 
-    for col in object_cols:
-        df[col] = df[col].apply(sanitize_field)
-
-    # Normalize empty-like values
-    df = df.replace(["nan", "NaN", "None", "NONE", "null", "NULL"], "")
+    for col in df.columns:
+        if col in object_cols:
+            cleaned = sanitize_series(df[col])
+            # Normalize empty-like values
+            df[col] = cleaned.where(~cleaned.isin(EMPTY_VALUES), "")
+        elif not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].replace(EMPTY_VALUES, "")
 
     df = clean_numeric_fields(df)
     return df
@@ -141,13 +345,341 @@ def clear_fields(df: pd.DataFrame) -> pd.DataFrame:
 # ---------------------------------------------------------------------------
 # Generic text replacement
 # ---------------------------------------------------------------------------
-def replace_text(text: Any, mapping: Dict[str, str]) -> str:
+class _Stage:
+    """
+    Entries that can be replaced in one pass, indexed so that a candidate
+    entry is checked against the whole stage in O(key length) set lookups.
+    False positives only cost an extra pass.
+    """
+
+    def __init__(self, max_key_length: int):
+        self.max_key_length = max_key_length
+        self.entries: List[tuple] = []
+        self.olds = set()
+        self.old_lengths = set()
+        self.old_prefixes = set()
+        self.news = set()
+        self.new_lengths = set()
+        self.new_prefixes = set()
+        self.new_suffixes = set()
+        self.joined_news = ""
+        self.deletes = False
+
+    @staticmethod
+    def _contains_any(text: str, values: set, lengths: set) -> bool:
+        return any(
+            text[start:start + length] in values
+            for length in lengths if length <= len(text)
+            for start in range(len(text) - length + 1)
+        )
+
+    def conflicts(self, old: str) -> bool:
+        """
+        True if <old> cannot join the stage, i.e. replacing it after the
+        stage could differ from replacing it in the same pass.
+        """
+        # Empty keys insert text between every character: own pass
+        if not old or "" in self.olds:
+            return True
+        # Deleting text can join its neighbours into a new match
+        if self.deletes and len(old) > 1:
+            return True
+        # The key matching (part of) an earlier replacement
+        if old in self.joined_news or self._contains_any(old, self.news, self.new_lengths):
+            return True
+        if any(old[:k] in self.new_suffixes or old[-k:] in self.new_prefixes for k in range(1, len(old))):
+            return True
+        # The key containing an earlier key, or starting before one and overlapping it
+        if self._contains_any(old, self.olds, self.old_lengths):
+            return True
+        return any(old[-k:] in self.old_prefixes for k in range(1, len(old)))
+
+    def add(self, old: str, new: str):
+        self.entries.append((old, new))
+        self.olds.add(old)
+        self.old_lengths.add(len(old))
+        self.old_prefixes.update(old[:k] for k in range(1, len(old)))
+        if not new:
+            self.deletes = True
+            return
+        self.news.add(new)
+        self.new_lengths.add(len(new))
+        # Keys are never longer than max_key_length, so longer overlaps cannot occur
+        for k in range(1, min(len(new), self.max_key_length)):
+            self.new_prefixes.add(new[:k])
+            self.new_suffixes.add(new[-k:])
+        self.joined_news += "\0" + new
+
+
+def _trie_pattern(keys: List[str]) -> str:
+    """
+    Regex matching any of <keys>, longest key first at each position
+    (characters are factored into a trie, shorter keys become optional tails).
     """
-    Replaces text based on a mapping dictionary.
+    trie: Dict[str, Any] = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def _pattern(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + _pattern(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return _pattern(trie)
+
+
+class TextReplacer:
     """
+    Compiled form of a replace_text mapping, built once and applied to
+    any number of values.
+
+    Semantics are those of the sequential loop
+
+        for old, new in mapping.items():
+            text = text.replace(old, new)
+
+    entries run in mapping order, each one replaces all non-overlapping
+    occurrences from left to right, and later entries also see the output
+    of earlier ones ({"a": "b", "b": "c"} turns "a" into "c").
+
+    The mapping is split into stages of consecutive entries that cannot
+    affect each other (no key matching an earlier replacement or
+    overlapping an earlier key). Each stage runs as one regex pass over
+    the text, so a 2,000-entry translation table usually needs a handful
+    of passes instead of 2,000 str.replace calls. Single-entry stages use
+    str.replace directly.
+    """
+
+    def __init__(self, mapping: Dict[str, str]):
+        self.mapping = dict(mapping)
+        self.stages: List[tuple] = []
+
+        max_key_length = max(map(len, self.mapping), default=0)
+        stage = _Stage(max_key_length)
+        for old, new in self.mapping.items():
+            if stage.entries and stage.conflicts(old):
+                self._add_stage(stage.entries)
+                stage = _Stage(max_key_length)
+            stage.add(old, new)
+        if stage.entries:
+            self._add_stage(stage.entries)
+
+    def _add_stage(self, entries: List[tuple]):
+        if len(entries) == 1:
+            self.stages.append(entries[0])
+            return
+        lookup = dict(entries)
+        pattern = re.compile(_trie_pattern(list(lookup)))
+        self.stages.append((pattern, lambda match, lookup=lookup: lookup[match.group()]))
+
+    def replace(self, text: str) -> str:
+        for old, new in self.stages:
+            if isinstance(old, str):
+                text = text.replace(old, new)
+            else:
+                text = old.sub(new, text)
+        return text
+
+    def __call__(self, text: Any) -> str:
+        """replace_text for a single value (NaN -> "")."""
+        if pd.isna(text):
+            return ""
+        return self.replace(str(text))
+
+    def replace_series(self, series: pd.Series) -> pd.Series:
+        """
+        Columnar replace_text with identical output: each distinct value
+        is replaced once (pd.factorize), missing values become "".
+        """
+        return apply_to_distinct(series, lambda values: [self(v) for v in values], "")
+
+    def __repr__(self) -> str:
+        return f"TextReplacer({len(self.mapping)} entries, {len(self.stages)} passes)"
+
+
+def replace_text(text: Any, mapping: Union[Dict[str, str], TextReplacer]) -> str:
+    """
+    Replaces text based on a mapping dictionary, entries in order (see
+    TextReplacer for the exact semantics). Pass a TextReplacer built once
+    instead of a large dict, or use its replace_series for whole columns.
+    """
+    if isinstance(mapping, TextReplacer):
+        return mapping(text)
     if pd.isna(text):
         return ""
     result = str(text)
     for old, new in mapping.items():
         result = result.replace(old, new)
     return result
+
+
+
+# ---------------------------------------------------------------------------
+# Declarative cleaning plans
+# ---------------------------------------------------------------------------
+class CleaningPlanError(Exception):
+    """Raised when the transforms of a mapping file are invalid."""
+    pass
+
+
+def _sanitize_step(series: pd.Series) -> pd.Series:
+    """Text cleaning as done by clear_fields (sanitize + empty-like values -> '')."""
+    cleaned = sanitize_series(series)
+    return cleaned.where(~cleaned.isin(EMPTY_VALUES), "")
+
+
+def _map_step(lookup: Union[Dict[Any, Any], IdMap]) -> Callable[[pd.Series], pd.Series]:
+    if isinstance(lookup, IdMap):
+        return lookup.lookup
+    return lambda series: series.map(lookup)
+
+
+def _replace_ids_step(lookup: Union[Dict[str, str], IdMap]) -> Callable[[pd.Series], pd.Series]:
+    return lambda series: replace_ids_series(series, lookup)
+
+
+# Transforms without arguments; each one matches the helper of the same purpose
+SIMPLE_TRANSFORMS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+    "sanitize": _sanitize_step,
+    "datetime": _datetime_series,
+    "email": lambda series: series.apply(_validate_email),
+    "extract_email": lambda series: series.apply(lambda x: ",".join(extract_email(x))),
+    "numeric": lambda series: pd.to_numeric(series, errors="coerce").fillna(0),
+}
+
+# Transforms taking the name of a value map: {"map": "recordtype_map"}
+MAP_TRANSFORMS = {
+    "map": _map_step,
+    "replace_ids": _replace_ids_step,
+    "replace_text": lambda mapping: TextReplacer(mapping).replace_series,
+}
+
+
+class CleaningPlan:
+    """
+    Compiled per-column transforms (see compile_cleaning_plan).
+
+    Every column is processed in a single pass: its distinct values
+    (NaN included) are factorized once, the whole chain of steps runs
+    on those uniques, and the result is expanded back to the rows.
+    """
+
+    def __init__(self, default_steps: List[Callable], columns: List[tuple]):
+        self.default_steps = default_steps
+        self.columns = columns  # (target, source, steps)
+
+    @staticmethod
+    def _run(series: pd.Series, steps: List[Callable]) -> pd.Series:
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        values = pd.Series(uniques, dtype=series.dtype)
+        for step in steps:
+            values = step(values)
+
+        result = values.iloc[codes]
+        result.index = series.index
+        return result
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Run the plan on <df> (in place) and return it."""
+        explicit = {target for target, _, _ in self.columns}
+
+        if self.default_steps:
+            for col in df.select_dtypes(include="object").columns:
+                if col not in explicit:
+                    df[col] = self._run(df[col], self.default_steps)
+
+            # Numeric columns are cleaned as by clear_fields / clean_numeric_fields
+            for col in df.columns:
+                if col not in explicit and pd.api.types.is_numeric_dtype(df[col]):
+                    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+        for target, source, steps in self.columns:
+            if source not in df.columns:
+                print(f"[CLEAN] Column '{source}' not in data, transform for '{target}' skipped")
+                continue
+            df[target] = self._run(df[source], steps)
+
+        return df
+
+
+def _compile_steps(steps: List[Any], maps: Dict[str, Any], column: str) -> List[Callable]:
+    compiled = []
+    for step in steps:
+        if isinstance(step, str):
+            if step not in SIMPLE_TRANSFORMS:
+                raise CleaningPlanError(
+                    f"Unknown transform '{step}' for '{column}'. "
+                    f"Available: {sorted(SIMPLE_TRANSFORMS) + sorted(MAP_TRANSFORMS)}"
+                )
+            compiled.append(SIMPLE_TRANSFORMS[step])
+            continue
+
+        if not isinstance(step, dict) or len(step) != 1 or next(iter(step)) not in MAP_TRANSFORMS:
+            raise CleaningPlanError(f"Invalid transform {step!r} for '{column}'")
+
+        kind, map_name = next(iter(step.items()))
+        if map_name not in maps:
+            raise CleaningPlanError(
+                f"Value map '{map_name}' for '{column}' not found in the mapping file or lookups"
+            )
+        compiled.append(MAP_TRANSFORMS[kind](maps[map_name]))
+
+    return compiled
+
+
+def compile_cleaning_plan(
+    mapping: Dict[str, Any],
+    lookups: Dict[str, Any] = None,
+    section: str = "transforms"
+) -> CleaningPlan:
+    """
+    Compile the per-column transforms of a mapping file into a CleaningPlan.
+
+    The <section> of the mapping (default "transforms") lists the steps
+    per Salesforce column, applied in order:
+        "transforms": {
+            "*": ["sanitize"],                         # every other text column (+ numeric cleanup)
+            "CreatedDate": ["datetime"],
+            "vDMC_Email__c": ["sanitize", "email"],
+            "OwnerId": ["sanitize", {"map": "user_map"}],
+            "RecordTypeId": {"source": "Type", "steps": [{"map": "recordtype_map"}, {"map": "record_types"}]},
+            "Contacts": [{"replace_ids": "contact_map"}]
+        }
+
+    Steps: sanitize (as clear_fields), datetime (convert_datetime), email
+    (clean_emails), extract_email, numeric, {"map": name} (Series.map),
+    {"replace_ids": name} (replace_ids_in_list) and {"replace_text": name}
+    (TextReplacer). Map names refer to other sections of the mapping file
+    (e.g. "recordtype_map") or to <lookups> built at runtime
+    (e.g. {"user_map": get_field_map(...)}).
+
+    With a "*" entry, numeric columns without their own entry are cleaned
+    like clean_numeric_fields (NaN -> 0), so {"*": ["sanitize"]} does what
+    clear_fields does.
+    """
+    maps = {**mapping, **(lookups or {})}
+    spec = mapping.get(section)
+    if not isinstance(spec, dict):
+        raise CleaningPlanError(f"Mapping has no '{section}' section")
+
+    default_steps = []
+    columns = []
+    for column, column_spec in spec.items():
+        if column == "*":
+            default_steps = _compile_steps(column_spec, maps, column)
+            continue
+
+        if isinstance(column_spec, dict):
+            source = column_spec.get("source", column)
+            steps = column_spec.get("steps", [])
+        else:
+            source, steps = column, column_spec
+
+        columns.append((column, source, _compile_steps(steps, maps, column)))
+
+    return CleaningPlan(default_steps, columns)
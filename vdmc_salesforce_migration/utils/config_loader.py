@@ -36,11 +36,6 @@ def get_mappings_dir() -> str:
     return cfg.get("mappings", {}).get("directory", "mappings")
 
 
-def get_default_batch_size() -> int:
-    cfg = load_config()
-    return cfg.get("salesforce", {}).get("default_batch_size", 10000)
-
-
 def get_default_env() -> str:
     cfg = load_config()
     return cfg.get("salesforce", {}).get("environment", "dev")
@@ -48,3 +43,32 @@ def get_default_env() -> str:
 def get_default_api_version() -> str:
     cfg = load_config()
     return cfg.get("salesforce", {}).get("api-version", 63)
+
+def get_bulk_max_job_bytes() -> int:
+    cfg = load_config()
+    return cfg.get("salesforce", {}).get("bulk_max_job_bytes", 100 * 1024 * 1024)
+
+
+def get_bulk_max_concurrent_jobs() -> int:
+    cfg = load_config()
+    return cfg.get("salesforce", {}).get("bulk_max_concurrent_jobs", 4)
+
+def get_bulk_query_threshold() -> int:
+    cfg = load_config()
+    return cfg.get("salesforce", {}).get("bulk_query_threshold", 50000)
+
+def get_cleanup_max_workers() -> int:
+    cfg = load_config()
+    return cfg.get("salesforce", {}).get("cleanup_max_workers", 4)
+
+def get_lookup_cache_settings() -> dict:
+    cfg = load_config()
+    return cfg.get("lookup_cache", {})
+
+def get_rate_control_settings() -> dict:
+    cfg = load_config()
+    return cfg.get("rate_control", {})
+
+def get_async_rate_control_settings() -> dict:
+    cfg = load_config()
+    return {**cfg.get("rate_control", {}), **cfg.get("async_rate_control", {})}
@@ -0,0 +1,39 @@
+from typing import Any, Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+# inferred dtypes whose equal values also print the same; anything else
+# (1 / 1.0 / True, 0.0 / -0.0, Decimal("1.0") / Decimal("1.00")) is not merged
+FACTORIZE_SAFE_TYPES = ("string", "empty", "integer", "boolean", "datetime64", "datetime", "date", "bytes")
+
+
+def apply_to_distinct(
+    series: pd.Series,
+    func: Callable[[pd.Series], Sequence[Any]],
+    na_value: Any,
+    dtype: Any = None,
+) -> pd.Series:
+    """
+    Run a column transform once per distinct value and broadcast the results back.
+
+    <func> receives the distinct non-missing values as a Series (index 0..n-1)
+    and returns one result per value; missing rows get <na_value>. Columns
+    whose equal values can print differently are not deduplicated, so the
+    result always equals applying <func> row by row. The result dtype is
+    <dtype>, or inferred like pd.Series(list_of_results).
+    """
+    if pd.api.types.infer_dtype(series, skipna=True) in FACTORIZE_SAFE_TYPES:
+        codes, uniques = pd.factorize(series)
+        values = pd.Series(uniques)
+    else:
+        present = np.flatnonzero(series.notna().to_numpy())
+        codes = np.full(len(series), -1, dtype=np.intp)
+        codes[present] = np.arange(len(present))
+        values = series.iloc[present].reset_index(drop=True)
+
+    results = np.empty(len(values) + 1, dtype=object)
+    results[:-1] = np.asarray(func(values), dtype=object)
+    # Code -1 (missing) picks the trailing <na_value>
+    results[-1] = na_value
+    return pd.Series(results[codes], index=series.index, dtype=dtype)
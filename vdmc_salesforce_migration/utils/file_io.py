@@ -1,6 +1,7 @@
 import os
 import json
 from pathlib import Path
+from typing import Any, Iterator, List, Optional, Union
 import pandas as pd
 from vdmc_salesforce_migration.utils.config_loader import get_input_dir, get_mappings_dir
 input_dir = get_input_dir()
@@ -59,26 +60,65 @@ def load_table_mapping(mapping_file: str, table_name: str) -> dict:
     return mapping[table_name]
 
 
-def load_file_with_mapping(pattern: str, mapping_file: str, table_name: str) -> pd.DataFrame:
+def _rename_chunks(reader: Iterator[pd.DataFrame], source_fields: List[str], mapping: dict) -> Iterator[pd.DataFrame]:
+    with reader:
+        for chunk in reader:
+            yield chunk[source_fields].rename(columns=mapping)
+
+
+def load_file_with_mapping(
+    pattern: str,
+    mapping_file: str,
+    table_name: str,
+    dtype: Any = str,
+    engine: Optional[str] = None,
+    chunksize: Optional[int] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
     """
     Load the newest CSV file matching pattern and apply a mapping.
+
+    Only the mapped source columns are read (usecols), as strings by
+    default so IDs and codes keep their leading zeros; pass dtype=None to
+    let pandas infer types, or a dict keyed by source column. The header is
+    checked first, so missing fields fail before the data is read.
+
+    engine is passed to pd.read_csv ("c", "python" or "pyarrow"). With
+    <chunksize>, an iterator of renamed DataFrames of that many rows is
+    returned instead of one DataFrame (not supported by "pyarrow").
     """
 
     input_path = project_root() / input_dir
     newest_file = get_latest_file(input_path, pattern)
 
-    df = pd.read_csv(newest_file)
-
     # Extract only the mapping for the specific table
     mapping = load_table_mapping(mapping_file, table_name)
 
     # Restrict to the keys that exist in the mapping
     source_fields = list(mapping.keys())
 
-    missing_fields = [f for f in source_fields if f not in df.columns]
+    header = pd.read_csv(newest_file, nrows=0).columns
+    missing_fields = [f for f in source_fields if f not in header]
     if missing_fields:
         raise FileLoadError(f"Missing fields in CSV: {missing_fields}")
 
+    if chunksize and engine == "pyarrow":
+        raise FileLoadError("chunksize is not supported with the pyarrow engine")
+
+    # A single dtype applies to the mapped columns only, not to an index column
+    if dtype is not None and not isinstance(dtype, dict):
+        dtype = {field: dtype for field in source_fields}
+
+    read_options = {"usecols": source_fields, "dtype": dtype}
+    if engine:
+        read_options["engine"] = engine
+
+    if chunksize:
+        reader = pd.read_csv(newest_file, chunksize=chunksize, **read_options)
+        return _rename_chunks(reader, source_fields, mapping)
+
+    df = pd.read_csv(newest_file, **read_options)
+
+    # usecols keeps the file order; restore the mapping order
     df = df[source_fields]
 
     # Apply Salesforce renaming
@@ -0,0 +1,169 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from vdmc_salesforce_migration.utils.distinct import apply_to_distinct
+
+# Pairs are converted to arrays in chunks of this size while building
+BUILD_CHUNK_SIZE = 100000
+
+
+def _encode(values: np.ndarray) -> np.ndarray:
+    """str array -> UTF-8 byte array (plain cast when everything is ASCII)."""
+    try:
+        return values.astype(bytes)
+    except UnicodeEncodeError:
+        return np.char.encode(values, "utf-8")
+
+
+def _decode(values: np.ndarray) -> np.ndarray:
+    """UTF-8 byte array -> object array of str."""
+    try:
+        return values.astype(str).astype(object)
+    except UnicodeDecodeError:
+        return np.char.decode(values, "utf-8").astype(object)
+
+
+class IdMap(Mapping):
+    """
+    Compact, read-only str -> str lookup for multi-million-entry ID maps.
+
+    Keys and values are kept as two UTF-8 encoded fixed-width byte arrays,
+    sorted by key, instead of one Python string object per entry: 10M
+    external IDs take a few hundred MB instead of several GB.
+
+    lookup() / map_columns() resolve a whole column with one binary search
+    (np.searchsorted). IdMap also behaves like a read-only dict (get, [],
+    in, len, iteration), so existing dict-based code keeps working.
+
+    Entries with a None key or value are skipped; keys and values are
+    compared as strings. For duplicate keys the last pair wins, like dict.
+    """
+
+    def __init__(self, keys: np.ndarray, values: np.ndarray):
+        self._keys = keys
+        self._values = values
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[Any, Any]]) -> "IdMap":
+        """Build from (key, value) pairs, e.g. streamed query results."""
+        key_chunks: List[np.ndarray] = []
+        value_chunks: List[np.ndarray] = []
+        keys: List[bytes] = []
+        values: List[bytes] = []
+
+        def _flush():
+            if keys:
+                key_chunks.append(np.array(keys, dtype=bytes))
+                value_chunks.append(np.array(values, dtype=bytes))
+                keys.clear()
+                values.clear()
+
+        for key, value in pairs:
+            if key is None or value is None:
+                continue
+            keys.append(str(key).encode("utf-8"))
+            values.append(str(value).encode("utf-8"))
+            if len(keys) >= BUILD_CHUNK_SIZE:
+                _flush()
+        _flush()
+
+        if not key_chunks:
+            return cls(np.array([], dtype="S1"), np.array([], dtype="S1"))
+
+        all_keys = np.concatenate(key_chunks)
+        all_values = np.concatenate(value_chunks)
+
+        # Stable sort keeps input order among duplicates; keep the last one
+        order = np.argsort(all_keys, kind="stable")
+        all_keys = all_keys[order]
+        all_values = all_values[order]
+        last = np.append(all_keys[1:] != all_keys[:-1], True)
+
+        return cls(all_keys[last], all_values[last])
+
+    @classmethod
+    def from_dict(cls, mapping: Dict[Any, Any]) -> "IdMap":
+        return cls.from_pairs(mapping.items())
+
+    # ------------------------------------------------------------------
+    # Vectorized lookups
+    # ------------------------------------------------------------------
+    def _positions(self, encoded: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (found mask, key positions of the found entries) for encoded keys."""
+        found = np.zeros(len(encoded), dtype=bool)
+        if not len(self._keys) or not len(encoded):
+            return found, np.array([], dtype=np.intp)
+
+        # Longer keys cannot match and must not be truncated to the key width
+        if encoded.dtype.itemsize > self._keys.dtype.itemsize:
+            fits = np.char.str_len(encoded) <= self._keys.dtype.itemsize
+        else:
+            fits = np.ones(len(encoded), dtype=bool)
+        candidates = encoded[fits].astype(self._keys.dtype)
+
+        positions = np.searchsorted(self._keys, candidates)
+        positions[positions == len(self._keys)] = 0
+        hits = self._keys[positions] == candidates
+
+        found[np.flatnonzero(fits)[hits]] = True
+        return found, positions[hits]
+
+    def lookup(self, series: pd.Series) -> pd.Series:
+        """
+        Map a Series through the IdMap, like series.map(dict):
+        values without an entry (and nulls) become NaN.
+
+        Each distinct value is searched once, so columns with many
+        repeated keys (owners, record types, parents) are cheap.
+        """
+        return apply_to_distinct(series, self._lookup_distinct, np.nan, dtype=object)
+
+    def _lookup_distinct(self, values: pd.Series) -> np.ndarray:
+        mapped = np.full(len(values), np.nan, dtype=object)
+        if len(values):
+            queries = np.asarray(values.astype(str), dtype=str)
+            found, positions = self._positions(_encode(queries))
+            mapped[np.flatnonzero(found)] = _decode(self._values[positions])
+        return mapped
+
+    def map_columns(self, df: pd.DataFrame, columns: Union[List[str], Dict[str, str]]) -> pd.DataFrame:
+        """
+        Map several columns in place. <columns> is a list of columns to
+        replace, or {source column: target column}.
+        """
+        if not isinstance(columns, dict):
+            columns = {column: column for column in columns}
+
+        for source, target in columns.items():
+            df[target] = self.lookup(df[source])
+        return df
+
+    # ------------------------------------------------------------------
+    # Mapping interface
+    # ------------------------------------------------------------------
+    def __getitem__(self, key: Any) -> str:
+        found, positions = self._positions(np.array([str(key).encode("utf-8")]))
+        if not found[0]:
+            raise KeyError(key)
+        return self._values[positions[0]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._keys:
+            yield key.decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the key and value arrays."""
+        return self._keys.nbytes + self._values.nbytes
+
+    def __repr__(self) -> str:
+        return f"IdMap({len(self)} entries, {self.nbytes / 1024 / 1024:.1f} MB)"
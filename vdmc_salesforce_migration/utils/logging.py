@@ -1,5 +1,8 @@
 import csv
 import datetime
+import threading
+import time
+import uuid
 from pathlib import Path
 
 def ensure_directory(path: Path):
@@ -9,17 +12,27 @@ def ensure_directory(path: Path):
     path.mkdir(parents=True, exist_ok=True)
 
 
-def get_log_file(base_dir: Path, object_name: str, prefix: str, env: str) -> Path:
+def new_run_id() -> str:
+    """
+    Short random id that keeps log files of concurrent runs apart.
+    """
+    return uuid.uuid4().hex[:8]
+
+
+def get_log_file(base_dir: Path, object_name: str, prefix: str, env: str, run_id: str = None) -> Path:
     """
     Construct a log file path like:
-      logs/preview/id_write_Account_1712345678.csv
+      logs/preview/id_write_Account_1712345678_3f9c2a1b.csv
+
+    The run id suffix (random unless given) keeps files unique even when
+    several uploads start in the same second.
     """
     timestamp = int(datetime.datetime.now().timestamp())
     env_dir = base_dir / env
 
     ensure_directory(env_dir)
 
-    filename = f"{prefix}_{object_name}_{timestamp}.csv"
+    filename = f"{prefix}_{object_name}_{timestamp}_{run_id or new_run_id()}.csv"
     return env_dir / filename
 
 
@@ -40,3 +53,85 @@ def append_csv_row(file_path: Path, row: list):
     with open(file_path, "a", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(row)
+
+
+class CsvLogWriter:
+    """
+    Buffered, thread-safe CSV log writer.
+
+    Rows are collected in memory and written when <flush_rows> rows are
+    buffered or <flush_interval> seconds have passed since the last flush.
+    The file is opened once and kept open until close().
+    Use as a context manager to make sure the buffer is flushed.
+    """
+
+    def __init__(self, file_path: Path, header: list, flush_rows: int = 1000, flush_interval: float = 5.0):
+        self.file_path = Path(file_path)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+        write_header = not self.file_path.exists()
+        self._file = open(self.file_path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(header)
+
+    def write_row(self, row: list):
+        """Buffer one row; flushes when a size or time threshold is reached."""
+        self.write_rows([row])
+
+    def write_rows(self, rows: list):
+        """Buffer several rows at once."""
+        with self._lock:
+            self._buffer.extend(rows)
+            if (
+                len(self._buffer) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked()
+
+    def flush(self):
+        """Write all buffered rows to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self._buffer = []
+            self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush remaining rows and close the file."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_locked()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_csv_log(
+    base_dir: Path,
+    object_name: str,
+    prefix: str,
+    env: str,
+    header: list,
+    run_id: str = None,
+    **kwargs
+) -> CsvLogWriter:
+    """
+    Create a uniquely named log file (see get_log_file) and return a CsvLogWriter for it.
+    """
+    file_path = get_log_file(base_dir, object_name, prefix, env, run_id=run_id)
+    return CsvLogWriter(file_path, header, **kwargs)
@@ -0,0 +1,201 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from vdmc_salesforce_migration.utils.logging import ensure_directory
+from vdmc_salesforce_migration.utils.config_loader import get_lookup_cache_settings, get_default_env
+
+root_dir = Path(__file__).resolve().parent.parent.parent
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    cache_key   TEXT PRIMARY KEY,
+    watermark   TEXT,
+    loaded_at   REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    size        INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    cache_key   TEXT NOT NULL,
+    id          TEXT NOT NULL,
+    key         TEXT,
+    value       TEXT,
+    PRIMARY KEY (cache_key, id)
+);
+"""
+
+# (Id, key, value, SystemModstamp)
+CacheRow = Tuple[str, Any, Any, Optional[str]]
+
+
+class LookupCache:
+    """
+    On-disk (SQLite) store for lookup maps such as get_field_map results.
+
+    Each entry holds the rows of one query (org, env, object, fields,
+    where-clause) by Salesforce Id plus the highest SystemModstamp seen,
+    so callers can refresh it incrementally:
+      - entries older than <ttl_seconds> are reported as expired (full reload)
+      - when the stored rows exceed <max_bytes>, least recently used entries
+        are evicted. Sizes count the row text (Id, JSON key and value), not
+        the SQLite file, which is larger (indexes, free pages) and does not
+        shrink after deletes
+    Keys and values are stored as JSON to keep REST types.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        ensure_directory(self.path.parent)
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One connection per call (committed on success) keeps the cache safe across threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(instance: str, env: str, object_name: str, fields: Iterable[str], where: str = None) -> str:
+        return json.dumps([instance, env, object_name, list(fields), where or ""])
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+    def get_watermark(self, cache_key: str) -> Optional[str]:
+        """
+        Return the SystemModstamp watermark of a fresh entry, or None if the
+        entry is missing or older than the TTL (a full reload is needed).
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT watermark, loaded_at FROM entries WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return row[0] or ""
+
+    def replace(self, cache_key: str, rows: Iterable[CacheRow]):
+        """Store a full snapshot of an entry."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM rows WHERE cache_key = ?", (cache_key,))
+            watermark = self._upsert_rows(conn, cache_key, rows, "")
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, 0)",
+                (cache_key, watermark, now, now)
+            )
+            self._update_size(conn, cache_key)
+        self._evict(keep=cache_key)
+
+    def apply_changes(self, cache_key: str, changed: Iterable[CacheRow], removed_ids: Iterable[str]):
+        """Merge an incremental refresh: upsert changed rows, drop removed Ids."""
+        with self._connect() as conn:
+            watermark = conn.execute(
+                "SELECT watermark FROM entries WHERE cache_key = ?", (cache_key,)
+            ).fetchone()[0] or ""
+            watermark = self._upsert_rows(conn, cache_key, changed, watermark)
+            conn.executemany(
+                "DELETE FROM rows WHERE cache_key = ? AND id = ?",
+                ((cache_key, record_id) for record_id in removed_ids)
+            )
+            conn.execute(
+                "UPDATE entries SET watermark = ?, last_used = ? WHERE cache_key = ?",
+                (watermark, time.time(), cache_key)
+            )
+            self._update_size(conn, cache_key)
+        self._evict(keep=cache_key)
+
+    def iter_pairs(self, cache_key: str) -> Iterator[Tuple[Any, Any]]:
+        """Yield the (key, value) pairs of an entry."""
+        with self._connect() as conn:
+            conn.execute("UPDATE entries SET last_used = ? WHERE cache_key = ?", (time.time(), cache_key))
+            cursor = conn.execute("SELECT key, value FROM rows WHERE cache_key = ?", (cache_key,))
+            for key, value in cursor:
+                yield json.loads(key), json.loads(value)
+
+    def load_map(self, cache_key: str) -> Dict[Any, Any]:
+        """Return the entry as {key: value}."""
+        return dict(self.iter_pairs(cache_key))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM rows")
+            conn.execute("DELETE FROM entries")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _upsert_rows(conn: sqlite3.Connection, cache_key: str, rows: Iterable[CacheRow], watermark: str) -> str:
+        """Write rows and return the new (highest) SystemModstamp watermark."""
+        def _encoded():
+            nonlocal watermark
+            for record_id, key, value, modstamp in rows:
+                if modstamp and modstamp > watermark:
+                    watermark = modstamp
+                yield cache_key, record_id, json.dumps(key), json.dumps(value)
+
+        conn.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?)", _encoded())
+        return watermark
+
+    @staticmethod
+    def _update_size(conn: sqlite3.Connection, cache_key: str):
+        conn.execute(
+            "UPDATE entries SET size = ("
+            "  SELECT COALESCE(SUM(LENGTH(id) + LENGTH(key) + LENGTH(value)), 0)"
+            "  FROM rows WHERE cache_key = ?"
+            ") WHERE cache_key = ?",
+            (cache_key, cache_key)
+        )
+
+    def _evict(self, keep: str = None):
+        """
+        Drop least recently used entries until the row text of the cache fits
+        into max_bytes. The entry <keep> (just written, about to be read) is
+        never dropped.
+        """
+        with self._connect() as conn:
+            entries = conn.execute(
+                "SELECT cache_key, size FROM entries ORDER BY last_used DESC"
+            ).fetchall()
+
+            total = 0
+            for cache_key, size in entries:
+                total += size
+                if total > self.max_bytes and cache_key != keep:
+                    conn.execute("DELETE FROM rows WHERE cache_key = ?", (cache_key,))
+                    conn.execute("DELETE FROM entries WHERE cache_key = ?", (cache_key,))
+
+
+_cache: Optional[LookupCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_lookup_cache() -> LookupCache:
+    """
+    Return the process-wide cache configured from the lookup_cache section
+    of config.yaml (one SQLite file per environment).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_lookup_cache_settings()
+            directory = root_dir / settings.get("directory", "cache")
+            _cache = LookupCache(
+                path=directory / f"lookups_{get_default_env()}.sqlite",
+                ttl_seconds=settings.get("ttl_hours", 24) * 3600,
+                max_bytes=settings.get("max_megabytes", 512) * 1024 * 1024,
+            )
+        return _cache
@@ -0,0 +1,138 @@
+import csv
+import io
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+# Anything the uploaders accept as input data
+RecordSource = Union[
+    List[Dict[str, Any]],
+    Iterable[Dict[str, Any]],
+    pd.DataFrame,
+    Iterable[pd.DataFrame],
+    str,
+    Path,
+]
+
+# Rows taken from a DataFrame at once when converting it to dicts
+FRAME_SLICE_SIZE = 10000
+
+
+class RecordSourceError(Exception):
+    """Raised when input data cannot be turned into upload records."""
+    pass
+
+
+def _iter_frame(df: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the rows of a DataFrame as dicts, one slice at a time,
+    so the full dict list is never materialized.
+    """
+    for start in range(0, len(df), FRAME_SLICE_SIZE):
+        yield from df.iloc[start:start + FRAME_SLICE_SIZE].to_dict("records")
+
+
+def iter_records(data: RecordSource) -> Iterator[Dict[str, Any]]:
+    """
+    Normalize any supported input into a lazy stream of record dicts.
+
+    Supported inputs:
+      - list / generator of dicts
+      - DataFrame
+      - iterator of DataFrames (e.g. pd.read_csv(..., chunksize=...))
+      - path to a CSV file (read row by row, values kept as strings)
+    """
+    if isinstance(data, (str, Path)):
+        path = Path(data)
+        if not path.exists():
+            raise RecordSourceError(f"CSV file not found: {path}")
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+        return
+
+    if isinstance(data, pd.DataFrame):
+        yield from _iter_frame(data)
+        return
+
+    for item in data:
+        if isinstance(item, pd.DataFrame):
+            yield from _iter_frame(item)
+        elif isinstance(item, dict):
+            yield item
+        else:
+            raise RecordSourceError(f"Unsupported record type: {type(item).__name__}")
+
+
+def is_empty_value(value: Any) -> bool:
+    """True for None, "", NaN, pd.NA and NaT (containers are never empty values)."""
+    if value is None or (isinstance(value, str) and value == ""):
+        return True
+    return pd.api.types.is_scalar(value) and bool(pd.isna(value))
+
+
+def clean_payload(record: Dict[str, Any], exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    REST / Composite body of <record>: <exclude> keys and empty values
+    dropped. NaN left by unmapped lookups (.map) is dropped too, since
+    JSON bodies reject it and would fail the whole request.
+    """
+    exclude = set(exclude)
+    return {k: v for k, v in record.items() if k not in exclude and not is_empty_value(v)}
+
+
+def _format_value(value: Any) -> Any:
+    """Render empty-like values (None, NaN, pd.NA, NaT) as empty CSV cells."""
+    return "" if is_empty_value(value) else value
+
+
+def iter_csv_payloads(
+    records: Iterable[Dict[str, Any]],
+    max_bytes: int,
+    max_records: Optional[int] = None,
+) -> Iterator[Tuple[bytes, int]]:
+    """
+    Serialize records into CSV payloads of at most <max_bytes> (UTF-8, header included).
+
+    Yields (payload, record_count). A new payload is started when the size
+    limit or <max_records> is reached, or when the record columns change.
+    Only one payload is held in memory at a time.
+    """
+    line_buffer = io.StringIO()
+    writer = csv.writer(line_buffer, lineterminator="\n")
+
+    def _encode(row: list) -> bytes:
+        line_buffer.seek(0)
+        line_buffer.truncate()
+        writer.writerow(row)
+        return line_buffer.getvalue().encode("utf-8")
+
+    fieldnames = None
+    header = b""
+    lines: List[bytes] = []
+    size = 0
+
+    for record in records:
+        if fieldnames is None or record.keys() != fieldnames.keys():
+            if lines:
+                yield header + b"".join(lines), len(lines)
+            fieldnames = dict.fromkeys(record.keys())
+            header = _encode(list(fieldnames))
+            lines, size = [], len(header)
+
+        line = _encode([_format_value(record.get(f)) for f in fieldnames])
+
+        if len(header) + len(line) > max_bytes:
+            raise RecordSourceError(
+                f"Single record exceeds the payload limit of {max_bytes} bytes"
+            )
+
+        if lines and (size + len(line) > max_bytes or (max_records and len(lines) >= max_records)):
+            yield header + b"".join(lines), len(lines)
+            lines, size = [], len(header)
+
+        lines.append(line)
+        size += len(line)
+
+    if lines:
+        yield header + b"".join(lines), len(lines)
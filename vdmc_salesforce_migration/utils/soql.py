@@ -1,5 +1,28 @@
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterator, List, Union
+from urllib.parse import quote
+
+import pandas as pd
 from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+from vdmc_salesforce_migration.utils.config_loader import get_bulk_query_threshold, get_default_env
+from vdmc_salesforce_migration.utils.lookup_cache import get_lookup_cache, CacheRow
+from vdmc_salesforce_migration.utils.idmap import IdMap
+from vdmc_salesforce_migration.api import bulk2
+from vdmc_salesforce_migration.api.auth import configure_shared_client
+from vdmc_salesforce_migration.api.throttle import get_rate_controller, sf_usage
+
+# Query engines for the map helpers: "rest" (iter_query, the default), "bulk"
+# (Bulk API 2.0 query job) or "auto" (bulk from get_bulk_query_threshold() rows
+# on). REST returns JSON-typed values, Bulk CSV strings (None for empty fields),
+# so "bulk" and "auto" are opt-in and meant for text keys/values such as Ids.
+ENGINES = ("auto", "rest", "bulk")
+
+# Keep IN-clause queries well below the URI length limit (~16k) of REST GET
+# queries. Counted URL-encoded: quotes, commas and spaces take 3 characters each
+MAX_SOQL_LENGTH = 15000
 
 
 class SOQLMappingError(Exception):
@@ -7,37 +30,128 @@ class SOQLMappingError(Exception):
     pass
 
 
-def _extract_field(record: Dict[str, Any], field_path: str):
+@lru_cache(maxsize=256)
+def _field_accessor(field_path: str) -> Callable[[Dict[str, Any]], Any]:
     """
-    Extract nested SOQL results using dot notation.
-    Example: record["ProductSellingModel"]["PricingTermUnit"]
+    Compile a dotted field path into a function reading it from a REST record.
+    The path is split once; the returned function just indexes.
+    Example: "ProductSellingModel.PricingTermUnit" ->
+             record["ProductSellingModel"]["PricingTermUnit"]
     """
-    parts = field_path.split(".")
-    value = record
-    for part in parts:
+    parts = tuple(field_path.split("."))
+
+    if len(parts) == 1:
+        key = parts[0]
+
+        def _get(record):
+            try:
+                return record[key]
+            except Exception:
+                raise SOQLMappingError(f"Field '{field_path}' not found in record: {record}")
+        return _get
+
+    def _get_nested(record):
+        value = record
         try:
-            value = value[part]
+            for part in parts:
+                value = value[part]
         except Exception:
             raise SOQLMappingError(f"Field '{field_path}' not found in record: {record}")
-    return value
+        return value
+    return _get_nested
+
+
+def _extract_field(record: Dict[str, Any], field_path: str):
+    """
+    Extract nested SOQL results using dot notation.
+    Example: record["ProductSellingModel"]["PricingTermUnit"]
+    """
+    return _field_accessor(field_path)(record)
+
+
+def iter_query(client: Salesforce, soql: str, include_deleted: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a REST query page by page, following nextRecordsUrl.
+    Only the current page (up to 2,000 records) is held in memory; every
+    page request goes through the shared rate controller.
+    """
+    controller = get_rate_controller()
+    usage = sf_usage(client)
+
+    result = controller.call(lambda: client.query(soql, include_deleted=include_deleted), usage=usage)
+    while True:
+        yield from result["records"]
+
+        if result.get("done", True):
+            return
+        next_url = result["nextRecordsUrl"]
+        result = controller.call(
+            lambda: client.query_more(next_url, identifier_is_url=True, include_deleted=include_deleted),
+            usage=usage
+        )
+
+
+def _extract_column(row: Dict[str, str], field_path: str):
+    """
+    Read a field from a Bulk API 2.0 CSV row (nested fields are columns
+    like "ProductSellingModel.PricingTermUnit"). Empty values become None,
+    matching REST results.
+    """
+    try:
+        value = row[field_path]
+    except KeyError:
+        raise SOQLMappingError(f"Field '{field_path}' not found in Bulk query columns: {list(row)}")
+    return value if value != "" else None
+
+
+def _resolve_engine(client: Salesforce, engine: str, object_name: str, where: str = None) -> str:
+    """
+    Pick "rest" or "bulk". For "auto", a COUNT() query decides: objects
+    with at least get_bulk_query_threshold() matching rows use Bulk API 2.0.
+    """
+    if engine not in ENGINES:
+        raise SOQLMappingError(f"Unknown query engine '{engine}', expected one of {ENGINES}")
+    if engine != "auto":
+        return engine
+
+    where_clause = f" WHERE {where}" if where else ""
+    total = client.query(f"SELECT COUNT() FROM {object_name}{where_clause}")["totalSize"]
+    return "bulk" if total >= get_bulk_query_threshold() else "rest"
 
 
 def query_to_map(
     client: Salesforce,
     soql: str,
     key_field: str,
-    value_field: str
-) -> Dict[Any, Any]:
+    value_field: str,
+    engine: str = "rest",
+    compact: bool = False
+) -> Union[Dict[Any, Any], IdMap]:
     """
     Execute SOQL and return a dict mapping {key_field: value_field}.
     Supports nested fields using dot notation.
+
+    engine="bulk" runs the query as a Bulk API 2.0 job and builds the map
+    while the CSV result pages stream in; values are then strings (or None).
+
+    compact=True returns an IdMap (sorted byte arrays, str keys/values)
+    instead of a dict, for maps with millions of entries.
     """
-    results = client.query_all(soql)
-    mapping = {}
+    if engine == "bulk":
+        pairs = (
+            (_extract_column(row, key_field), _extract_column(row, value_field))
+            for row in bulk2.run_query(client, soql)
+        )
+    else:
+        get_key = _field_accessor(key_field)
+        get_value = _field_accessor(value_field)
+        pairs = ((get_key(rec), get_value(rec)) for rec in iter_query(client, soql))
 
-    for rec in results["records"]:
-        key = _extract_field(rec, key_field)
-        value = _extract_field(rec, value_field)
+    if compact:
+        return IdMap.from_pairs(pairs)
+
+    mapping = {}
+    for key, value in pairs:
         mapping[key] = value
 
     return mapping
@@ -58,86 +172,345 @@ def query_to_nested_map(
             }
         }
     """
-    results = client.query_all(soql)
+    get_outer = _field_accessor(outer_key)
+    get_inner = _field_accessor(inner_key)
+    get_value = _field_accessor(value_field)
     mapping: Dict[Any, Dict[Any, Any]] = {}
 
-    for rec in results["records"]:
-        outer = _extract_field(rec, outer_key)
-        inner = _extract_field(rec, inner_key)
-        value = _extract_field(rec, value_field)
+    for rec in iter_query(client, soql):
+        outer = get_outer(rec)
 
         if outer not in mapping:
             mapping[outer] = {}
 
-        mapping[outer][inner] = value
+        mapping[outer][get_inner(rec)] = get_value(rec)
 
     return mapping
 
 
+# ---------------------------------------------------------------------------
+# Lookup cache
+# ---------------------------------------------------------------------------
+def _iter_cache_rows(
+    client: Salesforce,
+    soql: str,
+    key_field: str,
+    value_field: str,
+    engine: str
+) -> Iterator[CacheRow]:
+    """
+    Yield (Id, key, value, SystemModstamp) rows for the lookup cache.
+    SystemModstamp is truncated to seconds in SOQL literal format
+    ("2024-05-01T10:00:00Z"), which makes REST and Bulk values comparable.
+    """
+    if engine == "bulk":
+        for row in bulk2.run_query(client, soql):
+            yield (
+                row["Id"],
+                _extract_column(row, key_field),
+                _extract_column(row, value_field),
+                row["SystemModstamp"][:19] + "Z",
+            )
+        return
+
+    get_key = _field_accessor(key_field)
+    get_value = _field_accessor(value_field)
+    for rec in iter_query(client, soql):
+        yield (
+            rec["Id"],
+            get_key(rec),
+            get_value(rec),
+            rec["SystemModstamp"][:19] + "Z",
+        )
+
+
+def _removed_ids(client: Salesforce, object_name: str, where: str, since: str):
+    """
+    Ids changed since <since> that no longer belong to the cached map:
+    records deleted, or updated so they no longer match <where>.
+    """
+    ids = []
+
+    if where:
+        soql = f"SELECT Id FROM {object_name} WHERE SystemModstamp >= {since} AND (NOT ({where}))"
+        ids.extend(rec["Id"] for rec in iter_query(client, soql))
+
+    try:
+        soql = f"SELECT Id FROM {object_name} WHERE IsDeleted = true AND SystemModstamp >= {since}"
+        ids.extend(rec["Id"] for rec in iter_query(client, soql, include_deleted=True))
+    except SalesforceMalformedRequest:
+        # Objects without IsDeleted (e.g. User) cannot be deleted anyway
+        pass
+
+    return ids
+
+
+def _cached_field_map(
+    client: Salesforce,
+    object_name: str,
+    key_field: str,
+    value_field: str,
+    where: str = None,
+    engine: str = "rest",
+    compact: bool = False
+) -> Union[Dict[Any, Any], IdMap]:
+    """
+    get_field_map backed by the on-disk lookup cache.
+
+    A missing or expired entry is loaded in full (with <engine>); a fresh
+    one is brought up to date with the rows whose SystemModstamp is newer
+    than the last sync, and deleted records are removed. Entries requested
+    with "bulk" or "auto" are also refreshed with Bulk, so one entry never
+    mixes typed REST values with CSV strings.
+    """
+    cache = get_lookup_cache()
+    cache_key = cache.make_key(
+        client.sf_instance, get_default_env(), object_name, [key_field, value_field], where
+    )
+    watermark = cache.get_watermark(cache_key)
+
+    fields = ", ".join(dict.fromkeys(["Id", key_field, value_field, "SystemModstamp"]))
+    conditions = [f"({where})"] if where else []
+
+    if watermark is None:
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        engine = _resolve_engine(client, engine, object_name, where)
+        cache.replace(
+            cache_key,
+            _iter_cache_rows(client, f"SELECT {fields} FROM {object_name}{where_clause}", key_field, value_field, engine)
+        )
+        print(f"[CACHE] Loaded {object_name} lookup ({key_field} → {value_field}) into cache")
+        return IdMap.from_pairs(cache.iter_pairs(cache_key)) if compact else cache.load_map(cache_key)
+
+    since = watermark or "1970-01-01T00:00:00Z"
+    conditions.append(f"SystemModstamp >= {since}")
+    soql = f"SELECT {fields} FROM {object_name} WHERE {' AND '.join(conditions)}"
+
+    if engine not in ENGINES:
+        raise SOQLMappingError(f"Unknown query engine '{engine}', expected one of {ENGINES}")
+    refresh_engine = "rest" if engine == "rest" else "bulk"
+    changed = list(_iter_cache_rows(client, soql, key_field, value_field, refresh_engine))
+    removed = _removed_ids(client, object_name, where, since)
+    cache.apply_changes(cache_key, changed, removed)
+
+    print(f"[CACHE] {object_name}: {len(changed)} changed, {len(removed)} removed since last sync")
+    return IdMap.from_pairs(cache.iter_pairs(cache_key)) if compact else cache.load_map(cache_key)
+
+
 def get_field_map(
     client: Salesforce,
     object_name: str,
     key_field: str,
     value_field: str,
-    where: str = None
-) -> Dict[Any, Any]:
+    where: str = None,
+    engine: str = "rest",
+    use_cache: bool = False,
+    compact: bool = False
+) -> Union[Dict[Any, Any], IdMap]:
     """
     Universal helper:
     Returns mapping[key_field] = value_field for any object.
 
+    engine: "rest" (default), "bulk" or "auto" (Bulk API 2.0 from
+    get_bulk_query_threshold() rows on). REST keeps JSON types (numbers,
+    booleans); Bulk returns strings and None for empty fields, so only use
+    "bulk"/"auto" when keys and values are text (Ids, text external IDs).
+    use_cache: serve the map from the on-disk lookup cache, refreshed
+    incrementally via SystemModstamp (see lookup_cache in config.yaml).
+    compact: return an IdMap instead of a dict (apply it with
+    id_map.lookup(df[col]) or id_map.map_columns(df, cols)).
+
     Examples:
     get_field_map(client, "Product2", "StockKeepingUnit", "Id")
     """
+    if use_cache:
+        return _cached_field_map(client, object_name, key_field, value_field, where, engine, compact)
+
     where_clause = f" WHERE {where}" if where else ""
     soql = f"SELECT {key_field}, {value_field} FROM {object_name}{where_clause}"
 
-    return query_to_map(client, soql, key_field, value_field)
+    engine = _resolve_engine(client, engine, object_name, where)
+    return query_to_map(client, soql, key_field, value_field, engine=engine, compact=compact)
 
 
 def get_sf_id_by_external(
     client: Salesforce,
     object_name: str,
-    external_id_field: str = "vDMC_SugarExternalId__c"
-) -> Dict[Any, Any]:
+    external_id_field: str = "vDMC_SugarExternalId__c",
+    engine: str = "rest",
+    use_cache: bool = False,
+    compact: bool = False
+) -> Union[Dict[Any, Any], IdMap]:
     """
     Returns mapping[external_id] = SalesforceId.
     Works for any object + any external ID field.
     """
-    soql = f"SELECT Id, {external_id_field} FROM {object_name}"
-    return query_to_map(client, soql, external_id_field, "Id")
+    return get_field_map(
+        client, object_name, external_id_field, "Id", engine=engine, use_cache=use_cache, compact=compact
+    )
 
 
 def get_external_by_sf_id(
     client: Salesforce,
     object_name: str,
-    external_id_field: str = "vDMC_SugarExternalId__c"
-) -> Dict[Any, Any]:
+    external_id_field: str = "vDMC_SugarExternalId__c",
+    engine: str = "rest",
+    use_cache: bool = False,
+    compact: bool = False
+) -> Union[Dict[Any, Any], IdMap]:
     """
     Returns mapping[SalesforceId] = external_id.
     Useful for reverse lookup or delta loads.
     """
-    soql = f"SELECT Id, {external_id_field} FROM {object_name}"
-    return query_to_map(client, soql, "Id", external_id_field)
+    return get_field_map(
+        client, object_name, "Id", external_id_field, engine=engine, use_cache=use_cache, compact=compact
+    )
+
+
+# ---------------------------------------------------------------------------
+# Targeted reference resolution
+# ---------------------------------------------------------------------------
+def _soql_literal(value: Any) -> str:
+    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def _encoded_length(text: str) -> int:
+    """Length of <text> once URL-encoded into the q= parameter of a query request."""
+    return len(quote(text, safe=""))
+
+
+def _chunk_in_queries(prefix: str, values: List[Any], max_length: int = MAX_SOQL_LENGTH) -> List[str]:
+    """
+    Split <values> into queries "<prefix> IN ('a','b',…)" of at most
+    <max_length> characters once URL-encoded.
+    """
+    queries = []
+    literals: List[str] = []
+    base_length = _encoded_length(f"{prefix} IN ()")
+    separator_length = _encoded_length(",")
+    length = base_length
+
+    for value in values:
+        literal = _soql_literal(value)
+        literal_length = _encoded_length(literal) + separator_length
+        if literals and length + literal_length > max_length:
+            queries.append(f"{prefix} IN ({','.join(literals)})")
+            literals, length = [], base_length
+        literals.append(literal)
+        length += literal_length
+
+    if literals:
+        queries.append(f"{prefix} IN ({','.join(literals)})")
+    return queries
+
+
+def resolve_references(
+    client: Salesforce,
+    df: pd.DataFrame,
+    spec: Dict[str, Dict[str, str]],
+    max_workers: int = 4
+) -> pd.DataFrame:
+    """
+    Resolve lookup columns by querying only the keys present in <df>.
 
+    <spec> maps each column to its lookup:
+        {
+            "OwnerId": {"object": "User", "key_field": "vDMC_SugarExternalId__c"},
+            "AccountId": {
+                "object": "Account",
+                "key_field": "vDMC_SugarExternalId__c",
+                "value_field": "Id",       # default "Id"
+                "target": "AccountId",     # default: overwrite the column
+                "where": "IsDeleted = false",
+            },
+        }
 
-def get_record_types(client: Salesforce, object_name: str) -> Dict[str, str]:
+    Distinct non-empty values are queried with chunked WHERE key IN (…)
+    queries, run by <max_workers> threads; columns with the same lookup
+    share one set of queries. Unresolved values become NaN, like
+    df[col].map(get_field_map(...)). Returns <df>, modified in place.
+    """
+    groups: Dict[tuple, List[str]] = {}
+    for column, lookup in spec.items():
+        group = (
+            lookup["object"],
+            lookup["key_field"],
+            lookup.get("value_field", "Id"),
+            lookup.get("where")
+        )
+        groups.setdefault(group, []).append(column)
+
+    configure_shared_client(client, max_workers)
+
+    def _run(soql):
+        return list(iter_query(client, soql))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (object_name, key_field, value_field, where), columns in groups.items():
+            keys = pd.unique(pd.concat([df[column] for column in columns]).dropna())
+            keys = [key for key in keys if key != ""]
+
+            condition = f"({where}) AND " if where else ""
+            prefix = f"SELECT {key_field}, {value_field} FROM {object_name} WHERE {condition}{key_field}"
+            queries = _chunk_in_queries(prefix, keys)
+
+            get_key = _field_accessor(key_field)
+            get_value = _field_accessor(value_field)
+            mapping = {}
+            for records in executor.map(_run, queries):
+                for rec in records:
+                    mapping[get_key(rec)] = get_value(rec)
+
+            for column in columns:
+                df[spec[column].get("target", column)] = df[column].map(mapping)
+
+            print(
+                f"[LOOKUP] {object_name}.{key_field}: {len(keys)} keys, "
+                f"{len(mapping)} resolved in {len(queries)} queries"
+            )
+
+    return df
+
+
+def get_record_types(client: Salesforce, object_name: str, use_cache: bool = False) -> Dict[str, str]:
     """
     Returns mapping[DeveloperName] = RecordTypeId for a given sObject.
     """
-    soql = (
-        "SELECT Id, DeveloperName "
-        "FROM RecordType "
-        f"WHERE SObjectType = '{object_name}'"
+    return get_field_map(
+        client,
+        "RecordType",
+        "DeveloperName",
+        "Id",
+        where=f"SObjectType = '{object_name}'",
+        engine="rest",
+        use_cache=use_cache
     )
-    return query_to_map(client, soql, "DeveloperName", "Id")
 
 
 def query_all_records(client, object_name):
     """Queries all Ids from an sObject and structures them for Bulk API."""
-    data_sf = client.query_all(f"SELECT Id FROM {object_name}")
+    data = [{"Id": rec["Id"]} for rec in iter_query(client, f"SELECT Id FROM {object_name}")]
+
+    print(f"{len(data)} {object_name} Records found.")
+    return data
+
+
+def iter_record_ids(client, object_name, where: str = None, page_size: int = 100000):
+    """
+    Streams all Ids of an sObject via a Bulk API 2.0 query job, structured for Bulk API.
+
+    Unlike query_all_records nothing is materialized: result pages are
+    fetched one at a time while the consumer (e.g. a Bulk delete) reads
+    the {"Id": ...} records, so millions of Ids never sit in memory at once.
+    """
+    soql = f"SELECT Id FROM {object_name}"
+    if where:
+        soql += f" WHERE {where}"
 
-    ids = [rec["Id"] for rec in data_sf["records"]]
-    data = [{"Id": id_value} for id_value in ids]
+    count = 0
+    for row in bulk2.run_query(client, soql, page_size=page_size):
+        count += 1
+        yield {"Id": row["Id"]}
 
-    print(f"{len(ids)} {object_name} Records found.")
-    return data
\ No newline at end of file
+    print(f"{count} {object_name} Records found.")